@@ -0,0 +1,114 @@
+"""Headless benchmark of the planners of `src.d_star` on the playing area.
+
+Usage: python benchmark_d_star.py [output.json]
+
+Each scenario (engine, resolution, side, opponent, start and goal) gives one JSON line with the wall time,
+the expansions, the heap operations and the peak memory of the first search and of the replan after the opponent moved.
+The lines are printed, and written to the output file if one is given, so that two runs can be compared.
+The wall time is measured while tracemalloc traces the allocations, it is only meant to be compared with other runs of this script.
+"""
+import json
+import sys
+import time
+import tracemalloc
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.constants import COMPACT_DTYPE, Side
+from src.d_star import ArrayDStarLight, DStarLight, State
+from src.playing_area import PlayingArea
+
+# Engine and whether it uses the compact arrays (`COMPACT_DTYPE`)
+ENGINES = {"DStarLight": (DStarLight, False), "ArrayDStarLight": (ArrayDStarLight, False), "ArrayDStarLight compact": (ArrayDStarLight, True)}
+RESOLUTIONS = [100, 50, 25]
+SIDES = [Side.BLUE, Side.YELLOW]
+# Start and goal of each move, in mm
+MOVES = [((300, 300), (2500, 1000)), ((300, 1800), (2700, 200)), ((1500, 150), (250, 1200))]
+# Position of the opponent during the first search, and the one it moves to before the replan, in mm
+OPPONENT_MOVES = [((2000, 1800), (1300, 1000)), ((2700, 300), (1700, 600))]
+
+Engine = DStarLight | ArrayDStarLight
+
+def free_cell(costs: NDArray[Shape["60,40"], Float], x: float, y: float, resolution: int) -> State:
+    """Free cell closest to the position (in mm)"""
+    free = np.argwhere(costs == 1)
+    cell = np.array([x / resolution, y / resolution])
+    (cx, cy) = free[np.argmin(np.sum((free - cell) ** 2, axis=1))]
+    return State(int(cx), int(cy))
+
+def measure(run) -> tuple[dict, Optional[NDArray[Shape["*, 2"], Float]]]:
+    """Wall time and peak memory of `run`, and the path it returns (None if it cannot be extracted)"""
+    tracemalloc.start()
+    begin = time.perf_counter()
+    try:
+        path = run()
+    except ValueError:
+        path = None
+    wall_time = time.perf_counter() - begin
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ({"wall_time": wall_time, "peak_memory": peak, "path_found": path is not None}, path)
+
+def counters(d_star: Engine, expansions: int, operations: int) -> dict:
+    return {"expansions": d_star.expansions - expansions, "heap_operations": d_star.u.operations() - operations}
+
+def run_scenario(engine: str, resolution: int, side: Side, opponent: tuple[tuple[float, float], tuple[float, float]], move: tuple[tuple[float, float], tuple[float, float]]) -> dict:
+    area = PlayingArea()
+    area.side = side
+    area.other_robot.zone.x_center, area.other_robot.zone.y_center = opponent[0]
+    (engine_class, compact) = ENGINES[engine]
+    costs = area.costs_at_resolution(resolution, compact)
+    start = free_cell(costs, *move[0], resolution)
+    goal = free_cell(costs, *move[1], resolution)
+
+    d_star = engine_class(start, goal, costs.copy(), COMPACT_DTYPE) if compact else engine_class(start, goal, costs.copy())
+    def first_search() -> NDArray[Shape["*, 2"], Float]:
+        d_star.compute_shortest_path(False)
+        return d_star.get_path()
+    (first, path) = measure(first_search)
+    first.update(counters(d_star, 0, 0))
+
+    # The opponent moves and the robot has done a quarter of the path
+    area.other_robot.zone.x_center, area.other_robot.zone.y_center = opponent[1]
+    new_costs = area.costs_at_resolution(resolution, compact)
+    obstacles = [State(int(x), int(y)) for (x, y) in np.argwhere(new_costs > costs)]
+    if path is not None:
+        (x, y) = path[len(path) // 4]
+        d_star.s_start = State(int(x), int(y))
+    for obstacle in obstacles:
+        d_star.costs[obstacle.value] = new_costs[obstacle.value]
+    (expansions, operations) = (d_star.expansions, d_star.u.operations())
+    def replan() -> NDArray[Shape["*, 2"], Float]:
+        d_star.add_obstacles(obstacles)
+        return d_star.get_path()
+    (replan_result, _) = measure(replan)
+    replan_result.update(counters(d_star, expansions, operations))
+
+    return {
+        "engine": engine,
+        "resolution": resolution,
+        "side": side.name,
+        "opponent": opponent,
+        "start": start.value,
+        "goal": goal.value,
+        "first_search": first,
+        "replan": replan_result,
+    }
+
+def main():
+    output = open(sys.argv[1], "w") if len(sys.argv) > 1 else None
+    for engine in ENGINES:
+        for resolution in RESOLUTIONS:
+            for side in SIDES:
+                for opponent in OPPONENT_MOVES:
+                    for move in MOVES:
+                        line = json.dumps(run_scenario(engine, resolution, side, opponent, move))
+                        print(line)
+                        if output is not None:
+                            output.write(line + "\n")
+    if output is not None:
+        output.close()
+
+if __name__ == "__main__":
+    main()
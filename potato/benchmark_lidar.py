@@ -0,0 +1,68 @@
+"""Headless benchmark of the conversion of the lidar scans by `src.robot.lidar`.
+
+Usage: python benchmark_lidar.py [output.json]
+
+The scans are synthetic `LaserScan` objects, shaped like those of the ydlidar at 12 Hz, so that no lidar is needed.
+Each step (conversion of the scan, coordinates on the field) gives one JSON line with its mean wall time per scan,
+next to the one of the conversion with Python loops it replaced, after checking that both give the same points.
+"""
+import json
+import math
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.robot.lidar import SCAN_CAPACITY, lidar
+
+SCAN_POINTS = 420 # Points of a scan at 12 Hz
+RUNS = 1000
+ROBOT = (1200.0, 800.0, 0.3) # Position (x, y in mm, theta) of the robot
+
+def synthetic_scan(count: int, seed: int = 0) -> SimpleNamespace:
+    """Scan with the attributes of a `LaserScan`: its points have an angle and a range (in m), 0 without detection, and an intensity"""
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(-math.pi, math.pi, count, endpoint=False)
+    ranges = np.where(rng.random(count) < 0.1, 0.0, rng.uniform(0.12, 4.0, count))
+    intensities = rng.integers(0, 1024, count)
+    return SimpleNamespace(points=[SimpleNamespace(angle=a, range=r, intensity=i) for (a, r, i) in zip(angles, ranges, intensities)])
+
+def loop_scan_points(points) -> NDArray[Shape["*, 3"], Float]:
+    return np.array([[math.pi - p.angle if p.angle >= 0 else -math.pi - p.angle, p.range * 1000 if p.range > 0 else np.inf, p.intensity] for p in points])
+
+def loop_coordinates(points_with_angle: NDArray[Shape["*, 3"], Float], robot_x: float, robot_y: float, robot_theta: float) -> NDArray[Shape["*, 3"], Float]:
+    return np.array([[robot_x + p[1] * math.cos(robot_theta + p[0]), robot_y + p[1] * math.sin(robot_theta + p[0]), p[2]] for p in points_with_angle])
+
+def wall_time(run: Callable[[], object]) -> float:
+    """Mean wall time of `run`, in ms"""
+    begin = time.perf_counter()
+    for _ in range(RUNS):
+        run()
+    return (time.perf_counter() - begin) / RUNS * 1000
+
+def main():
+    output = open(sys.argv[1], "w") if len(sys.argv) > 1 else None
+    scan = synthetic_scan(SCAN_POINTS)
+    buffer = np.empty((SCAN_CAPACITY, 3))
+
+    points = lidar.convert_scan(scan.points, buffer).copy()
+    assert np.array_equal(points, loop_scan_points(scan.points))
+    coordinates = lidar.get_lidar_coordinates(points, *ROBOT)
+    assert np.allclose(coordinates, loop_coordinates(points, *ROBOT), equal_nan=True)
+
+    results = [
+        {"step": "convert_scan", "points": SCAN_POINTS, "numpy_ms": wall_time(lambda: lidar.convert_scan(scan.points, buffer)), "loop_ms": wall_time(lambda: loop_scan_points(scan.points))},
+        {"step": "get_lidar_coordinates", "points": SCAN_POINTS, "numpy_ms": wall_time(lambda: lidar.get_lidar_coordinates(points, *ROBOT)), "loop_ms": wall_time(lambda: loop_coordinates(points, *ROBOT))},
+    ]
+    for result in results:
+        line = json.dumps(result)
+        print(line)
+        if output is not None:
+            output.write(line + "\n")
+    if output is not None:
+        output.close()
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import time
 from src.actions.action import ActionsSequence, Move
 from src.actions.generated_actions import *
 from src.constants import *
+from src.cost_atlas import cost_atlas
 from src.location.location import MoveForward, SideRelatedCoordinates, RelativeMove
 from src.logging import logging_info, start, logging_error
 from src.playing_area import playing_area
@@ -23,6 +24,8 @@ def main():
     robot.wait_to_start()
 
     logging_info("Ready to start")
+    playing_area.compute_costs()
+    cost_atlas.start_building()
     time.sleep(5)
 
     strategy = ActionsSequence(
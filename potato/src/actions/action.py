@@ -1,11 +1,16 @@
 import asyncio
 from enum import Enum
-from typing import Self
+from typing import Optional, Self
 from collections.abc import Callable, Awaitable
+from nptyping import NDArray, Float, Shape
 
+from src.anytime_planner import MAX_PLANNING_BUDGET, PLANNING_BUDGET_SHARE
 from src.constants import *
+from src.d_star import State
 from src.location.location import Location
 from src.logging import logging_info, logging_warning
+from src.planner_worker import planner_worker
+from src.playing_area import playing_area
 from src.robot.robot import robot, RobotMovement
 from src.robot.robot_actuator import RobotBinaryActuator
 from src.robot.servos.servo import Servo
@@ -324,6 +329,10 @@ class Move(Action):
         destination: Location
             The destination of the robot, it can either be an absolute location or the best possibility among many places.
 
+        pathfinding: bool
+            If true, the path around the obstacles is planned within `planning_budget` and sent to the robot.
+            The robot goes straight when the segment is clear or when no path is found in time. Default false.
+
         forced_angle: bool
             Is true if the robot must do a rotation to acheive the speciefed angle. Otherwise, focus only on the x & y coordinates
         
@@ -366,12 +375,43 @@ class Move(Action):
     def __str__(self) -> str:
         return f"Move to {str(self.destination)} {super().__str__()}"
 
+    def planning_budget(self) -> float:
+        """Time (in seconds) the planner can use before the robot starts moving, a share of the time left before `timer_limit`"""
+        return max(0, min(MAX_PLANNING_BUDGET, PLANNING_BUDGET_SHARE * self._timeout()))
+
     async def go_to_location(self) -> None:
         destination = self.destination.getLocation(robot.current_location.x, robot.current_location.y, robot.current_location.theta)
         if destination is None:
             raise GameElementNotAvailableException()
         (x, y, theta) = destination
-        await robot.go_to(x, y, theta, self.backwards, self.forced_angle, self.on_the_spot, self.max_speed, self.max_acceleration, self.precision)
+        path = await self.plan_path(x, y) if self.pathfinding else None
+        if path is None:
+            await robot.go_to(x, y, theta, self.backwards, self.forced_angle, self.on_the_spot, self.max_speed, self.max_acceleration, self.precision)
+            return
+        robot.send_d_star_path(path.tolist(), x, y, theta, self.backwards, self.forced_angle)
+        await robot.wait_end_of_movement()
+
+    async def plan_path(self, x: float, y: float) -> Optional[NDArray[Shape["*, 2"], Float]]:
+        """Path of the planner (in cells) to (x, y) in mm, computed within `planning_budget`.
+
+        Returns None when the straight command is sent instead: the segment is clear, there is no path or the budget ran out.
+        """
+        (width, depth) = playing_area.cost.shape
+        def cell(x: float, y: float) -> State:
+            # Positions on the border of the table are in the last cell
+            return State(min(max(int(x / D_STAR_FACTOR), 0), width - 1), min(max(int(y / D_STAR_FACTOR), 0), depth - 1))
+        start = cell(robot.current_location.x, robot.current_location.y)
+        goal = cell(x, y)
+        budget = self.planning_budget()
+        try:
+            path = await asyncio.wait_for(planner_worker.plan(start, goal), timeout=budget)
+        except asyncio.TimeoutError:
+            logging_warning(f"No path found in {budget:.2f}s, go straight to {x};{y}")
+            return None
+        except ValueError as ex:
+            logging_warning(f"{ex}, go straight to {x};{y}")
+            return None
+        return path if len(path) > 2 else None
 
     execute: Callable[[Self], Awaitable[None]] = go_to_location
 
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.d_star import ArrayDStarLight, State
+from src.logging import logging_debug
+
+# Weights of the heuristic, from the first quick search to the optimal one
+EPSILONS = [3.0, 2.0, 1.5, 1.0]
+# Expansions between two checks of the clock
+EXPANSIONS_PER_CHECK = 64
+# Share of the time left to an action given to the planner, and the maximum budget (in seconds)
+PLANNING_BUDGET_SHARE = 0.05
+MAX_PLANNING_BUDGET = 0.5
+
+class AnytimeDStarLight(ArrayDStarLight):
+    """`ArrayDStarLight` whose heuristic is multiplied by `epsilon` (Anytime D*).
+
+    A search with `epsilon` > 1 expands fewer cells and gives a path about at most `epsilon` times longer than the shortest one.
+    Lowering `epsilon` and searching again reuses the g values of the previous search,
+    and `epsilon` = 1 gives the costs of `ArrayDStarLight` (up to the interpolation of Field D*).
+    """
+    epsilon: float
+
+    def __init__(self, s_start: State, s_goal: State, costs: NDArray[Shape["60,40"], Float], epsilon: float = EPSILONS[0]) -> None:
+        self.epsilon = epsilon
+        super().__init__(s_start, s_goal, costs)
+
+    def calculate_key(self, s: int) -> tuple[float, float]:
+        k = min(self._g[s], self._rhs[s])
+        return (k + self.epsilon * self.heuristic(s) + self.k_m, k)
+
+    def set_epsilon(self, epsilon: float) -> None:
+        """Change the weight of the heuristic, the keys of the open list are computed again"""
+        self.epsilon = epsilon
+        # The cached pairs go around the first successor found, which was not the best one with a weighted heuristic
+        self.connbr[:] = 0
+        for u in np.flatnonzero(self._g != self._rhs).tolist():
+            self.u.push(u, self.calculate_key(u))
+
+    def compute_until(self, deadline: float) -> bool:
+        """Search with the current `epsilon` until `s_start` is consistent or `deadline` (from `time.monotonic`) is reached.
+
+        Returns whether the search is done, otherwise it can be resumed by calling it again.
+        """
+        start = self.to_id(self.s_start)
+        expansions = 0
+        while len(self.u) > 0 and (self.u.top_key() < self.calculate_key(start) or self._rhs[start] != self._g[start]):
+            if expansions % EXPANSIONS_PER_CHECK == 0 and time.monotonic() > deadline:
+                return False
+            _, u = self.u.pop()
+            expansions += 1
+            self.expansions += 1
+            if self._g[u] > self._rhs[u]:
+                self._g[u] = self._rhs[u]
+
+                for (offset, successor_bit) in self.topology.prevs_by_mask[self.topology.valid_prevs[u]]:
+                    prev = u + offset
+                    self.succs[prev] |= successor_bit
+                    self.update_vertex(prev, False)
+        # Unlike `compute_shortest_path`, the open list is kept for the next value of `epsilon`
+        return True
+
+class AnytimePlanner:
+    """Planner giving a path within a time budget, then improving it in the background.
+
+    `plan` searches with the largest weight of `epsilons` first, and lowers it while there is time left.
+    `keep_improving` finishes the remaining searches in a thread, `path` is replaced after each of them.
+
+    Attributes
+    ----------
+    d_star: AnytimeDStarLight
+        Search shared by all the weights
+
+    epsilons: list[float]
+        Weights of the heuristic not searched yet, the current one first
+
+    path: Optional[NDArray[(*, 2), Float]]
+        Best path found so far
+
+    path_epsilon: float
+        Weight of the search which gave `path`, the path is at most this many times longer than the shortest one
+    """
+    d_star: AnytimeDStarLight
+    epsilons: list[float]
+    path: Optional[NDArray[Shape["*, 2"], Float]]
+    path_epsilon: float
+    lock: threading.Lock
+
+    def __init__(self, start: State, goal: State, costs: NDArray[Shape["60,40"], Float], epsilons: list[float] = EPSILONS) -> None:
+        self.epsilons = list(epsilons)
+        self.d_star = AnytimeDStarLight(start, goal, costs, self.epsilons[0])
+        self.path = None
+        self.path_epsilon = np.inf
+        self.lock = threading.Lock()
+
+    def improve(self, deadline: float) -> bool:
+        """Search with the remaining weights until `deadline`, returns whether the shortest path was found"""
+        with self.lock:
+            while len(self.epsilons) > 0:
+                if self.d_star.epsilon != self.epsilons[0]:
+                    self.d_star.set_epsilon(self.epsilons[0])
+                if not self.d_star.compute_until(deadline):
+                    return False
+                try:
+                    path = self.d_star.get_path()
+                except ValueError:
+                    # Some cells next to the path are still inconsistent, the next search fixes them
+                    path = None
+                if path is not None:
+                    self.path = path
+                    self.path_epsilon = self.epsilons[0]
+                    logging_debug(f"Anytime path with epsilon {self.path_epsilon}")
+                self.epsilons.pop(0)
+            return True
+
+    def plan(self, budget: float) -> Optional[NDArray[Shape["*, 2"], Float]]:
+        """Best path found within `budget` seconds, None if there is none yet"""
+        self.improve(time.monotonic() + budget)
+        return self.path
+
+    def keep_improving(self) -> threading.Thread:
+        """Finish the remaining searches in the background"""
+        thread = threading.Thread(target=self.improve, args=(np.inf,))
+        thread.start()
+        return thread
@@ -1,12 +1,18 @@
 from enum import Enum
+import numpy as np
 
 
 MATCH_TIME: int = 100 # Duration of a match
 PLAYING_AREA_WIDTH = 3000
 PLAYING_AREA_DEPTH = 2000
 D_STAR_FACTOR = 50
+COMPACT_DTYPE = np.float32 # Type of the arrays of the compact planners and cost maps
 ROBOT_WIDTH = 280
 ROBOT_DEPTH = 240
+CLEARANCE_DISTANCE = 150 # Distance (in mm) from the obstacles grown by the robot size under which the planner pays a penalty
+CLEARANCE_PENALTY = 2 # Cost added to a cell touching an obstacle, decreasing to 0 at CLEARANCE_DISTANCE
+OPPONENT_PREDICTION_HORIZON = 1.0 # Time (in s) ahead over which the corridor swept by the opponent is predicted
+OPPONENT_CORRIDOR_COST = 10 # Cost of a cell of the predicted corridor of the opponent
 mock_robot = False # Use real serial or mock it
 
 ID_SERVO_PLANT_LEFT = 5
@@ -0,0 +1,171 @@
+import heapq
+import math
+import threading
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Bool, Float, Shape
+
+from src.constants import D_STAR_FACTOR, MARGIN_PLANTER, ROBOT_DEPTH
+from src.game_elements import PlantArea, Planter, PotArea, StartArea
+from src.grid_topology import CONNBR_DIRECTIONS, get_grid_topology
+from src.playing_area import BIG_NUMBER, PlayingArea, playing_area
+from src.zone import Circle, Zone
+
+# Length of the step towards each neighbour, in the `CONNBR_DIRECTIONS` order
+STEP_LENGTHS = np.array([math.hypot(dx, dy) for (dx, dy) in CONNBR_DIRECTIONS])
+
+def cost_to_go(costs: NDArray[Shape["60,40"], Float], goal: NDArray[Shape["60,40"], Bool]) -> NDArray[Shape["60,40"], Float]:
+    """Cost from every cell to the closest cell of `goal` (backward Dijkstra on the 8-connected grid).
+
+    Leaving a cell costs its cost times the length of the step, like the planner. Unreachable cells are at inf.
+    """
+    topology = get_grid_topology(*costs.shape)
+    flat_costs = np.ravel(costs)
+    field = np.full(topology.size, np.inf)
+    open_list: list[tuple[float, int]] = []
+    for s in np.flatnonzero(goal).tolist():
+        field[s] = 0
+        open_list.append((0, s))
+    heapq.heapify(open_list)
+    while len(open_list) > 0:
+        (value, v) = heapq.heappop(open_list)
+        if value > field[v]:
+            continue
+        for (k, u) in enumerate(topology.neighbours[v].tolist()):
+            if u < 0 or flat_costs[u] == np.inf:
+                continue
+            new_value = value + flat_costs[u] * STEP_LENGTHS[k]
+            if new_value < field[u]:
+                field[u] = new_value
+                heapq.heappush(open_list, (new_value, u))
+    return field.reshape(costs.shape)
+
+def descend(field: NDArray[Shape["60,40"], Float], costs: NDArray[Shape["60,40"], Float], start: tuple[int, int]) -> NDArray[Shape["*, 2"], Float]:
+    """Path of cells from `start` to the goal of `field`, following the steepest descent"""
+    topology = get_grid_topology(*costs.shape)
+    flat_field = np.ravel(field)
+    flat_costs = np.ravel(costs)
+    s = topology.to_id(*start)
+    path = [s]
+    if flat_field[s] == np.inf:
+        raise ValueError(f"No path from {start}")
+    while flat_field[s] > 0:
+        neighbours = topology.neighbours[s]
+        valid = neighbours >= 0
+        values = np.where(valid, flat_costs[s] * STEP_LENGTHS + flat_field[neighbours], np.inf)
+        s = int(neighbours[np.argmin(values)])
+        path.append(s)
+    return np.array([topology.coordinates(s) for s in path], dtype=float)
+
+class CostToGoField:
+    """Cost-to-go of one goal of the table, computed on a snapshot of the cost map
+
+    Attributes
+    ----------
+    values: NDArray[(60, 40), Float]
+        Cost from each cell to the goal, in cells of D_STAR_FACTOR mm
+
+    costs: NDArray[(60, 40), Float]
+        Cost map used for the field, with the goal zone itself free
+
+    support: NDArray[(60, 40), Bool]
+        Cells whose cost change can change the field: the cells reached without crossing an obstacle and their neighbours.
+        A change behind an obstacle only moves costs which are already over BIG_NUMBER.
+    """
+    values: NDArray[Shape["60,40"], Float]
+    costs: NDArray[Shape["60,40"], Float]
+    support: NDArray[Shape["60,40"], Bool]
+
+    def __init__(self, costs: NDArray[Shape["60,40"], Float], zone: Zone) -> None:
+        goal = zone.points_in_zone()
+        self.costs = costs.copy()
+        # The robot drives to the element, its own obstacle does not block the way
+        self.costs[goal] = 1
+        self.values = cost_to_go(self.costs, goal)
+        reached = self.values < BIG_NUMBER
+        self.support = reached.copy()
+        self.support[1:, :] |= reached[:-1, :]
+        self.support[:-1, :] |= reached[1:, :]
+        self.support[:, 1:] |= reached[:, :-1]
+        self.support[:, :-1] |= reached[:, 1:]
+
+    def travel_cost(self, x: float, y: float) -> float:
+        """Cost to go from the position (in mm) to the goal, in cells of D_STAR_FACTOR mm"""
+        (width, depth) = self.values.shape
+        return float(self.values[min(max(int(x / D_STAR_FACTOR), 0), width - 1), min(max(int(y / D_STAR_FACTOR), 0), depth - 1)])
+
+    def path(self, start: tuple[int, int]) -> NDArray[Shape["*, 2"], Float]:
+        return descend(self.values, self.costs, start)
+
+AtlasGoal = PlantArea | PotArea | Planter | StartArea
+
+class CostAtlas:
+    """Cost-to-go fields of the static goals of the table (plant areas, pot areas, planters and start areas).
+
+    The fields are built in the background by `start_building`, or on demand by `field`.
+    `refresh` compares the cost map of the playing area with the one of the atlas
+    and drops the fields whose support changed, they are rebuilt at the next build or request.
+    """
+    playing_area: PlayingArea
+    costs: NDArray[Shape["60,40"], Float]
+    fields: dict[int, CostToGoField]
+    lock: threading.Lock
+
+    def __init__(self, playing_area: PlayingArea) -> None:
+        self.playing_area = playing_area
+        self.costs = playing_area.cost.copy()
+        self.fields = {}
+        self.lock = threading.Lock()
+
+    def goals(self) -> list[AtlasGoal]:
+        return [*self.playing_area.plant_areas, *self.playing_area.pot_areas, *self.playing_area.planters, *self.playing_area.start_areas]
+
+    def goal_zone(self, goal: AtlasGoal) -> Zone:
+        if isinstance(goal, Planter):
+            return Circle(goal.coordinates.x, goal.coordinates.y, MARGIN_PLANTER + ROBOT_DEPTH / 2)
+        if isinstance(goal, StartArea):
+            return goal.zone
+        # The obstacle of the element covers its zone grown by the robot size
+        return goal.zone.zone_with_robot_size()
+
+    def refresh(self) -> None:
+        """Drop the fields built on a part of the cost map which changed since"""
+        with self.lock:
+            changed = self.playing_area.cost != self.costs
+            if not changed.any():
+                return
+            self.costs = self.playing_area.cost.copy()
+            for key in [key for (key, field) in self.fields.items() if (changed & field.support).any()]:
+                del self.fields[key]
+
+    def field(self, goal: AtlasGoal) -> CostToGoField:
+        self.refresh()
+        with self.lock:
+            key = id(goal)
+            if key not in self.fields:
+                self.fields[key] = CostToGoField(self.costs, self.goal_zone(goal))
+            return self.fields[key]
+
+    def build(self) -> None:
+        """Build the missing fields"""
+        for goal in self.goals():
+            self.field(goal)
+
+    def start_building(self) -> threading.Thread:
+        thread = threading.Thread(target=self.build)
+        thread.start()
+        return thread
+
+    def travel_cost(self, goal: AtlasGoal, x: float, y: float) -> Optional[float]:
+        """Cost to go from the position (in mm) to the goal, None if its field is not built yet"""
+        self.refresh()
+        field = self.fields.get(id(goal))
+        if field is None:
+            return None
+        return field.travel_cost(x, y)
+
+    def path(self, goal: AtlasGoal, start: tuple[int, int]) -> NDArray[Shape["*, 2"], Float]:
+        """Path of cells from `start` to the goal"""
+        return self.field(goal).path(start)
+
+cost_atlas = CostAtlas(playing_area) # Singleton
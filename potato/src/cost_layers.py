@@ -0,0 +1,135 @@
+from typing import Hashable, Optional
+import numpy as np
+from nptyping import NDArray, Bool, Float, Shape
+
+from src.zone import Window, Zone
+
+def intersection(a: Window, b: Window) -> Optional[Window]:
+    """Cells in both windows, None if they do not overlap"""
+    (x_start, x_stop) = (max(a[0].start, b[0].start), min(a[0].stop, b[0].stop))
+    if x_start >= x_stop:
+        return None
+    (y_start, y_stop) = (max(a[1].start, b[1].start), min(a[1].stop, b[1].stop))
+    if y_start >= y_stop:
+        return None
+    return (slice(x_start, x_stop), slice(y_start, y_stop))
+
+def union(a: Optional[Window], b: Window) -> Window:
+    """Smallest window covering both windows"""
+    if a is None or a[0].start >= a[0].stop or a[1].start >= a[1].stop:
+        return b
+    if b[0].start >= b[0].stop or b[1].start >= b[1].stop:
+        return a
+    return (slice(min(a[0].start, b[0].start), max(a[0].stop, b[0].stop)), slice(min(a[1].start, b[1].start), max(a[1].stop, b[1].stop)))
+
+def grow(window: Window, cells: int, shape: tuple[int, int]) -> Window:
+    """`window` grown by `cells` on each side, inside a grid of `shape`"""
+    return (
+        slice(max(window[0].start - cells, 0), min(window[0].stop + cells, shape[0])),
+        slice(max(window[1].start - cells, 0), min(window[1].stop + cells, shape[1])),
+    )
+
+def relative(window: Window, origin: Window) -> Window:
+    """`window` in the coordinates of an array covering `origin`"""
+    return (
+        slice(window[0].start - origin[0].start, window[0].stop - origin[0].start),
+        slice(window[1].start - origin[1].start, window[1].stop - origin[1].start),
+    )
+
+class CostLayer:
+    """Costs of one obstacle, kept only in the window of its bounding box
+
+    Attributes
+    ----------
+    geometry: Optional[tuple[float, ...]]
+        Geometry of the zone rasterized, to know if the layer must be computed again. None if the layer does not come from a zone.
+
+    window: Window
+        Cells of the planner grid covered by `costs`
+
+    costs: NDArray[(*, *), Float]
+        Costs of the cells of the window, 1 where the obstacle is not
+    """
+    geometry: Optional[tuple[float, ...]]
+    window: Window
+    costs: NDArray[Shape["*, *"], Float]
+
+    def __init__(self, geometry: Optional[tuple[float, ...]], window: Window, costs: NDArray[Shape["*, *"], Float]) -> None:
+        self.geometry = geometry
+        self.window = window
+        self.costs = costs
+
+def zone_layer(zone: Zone, resolution: int, blocked_cost: float) -> CostLayer:
+    (window, mask) = zone.window_mask(resolution)
+    return CostLayer(zone.geometry(), window, np.where(mask, blocked_cost, 1.0))
+
+def mask_layer(mask: NDArray[Shape["60,40"], Bool], blocked_cost: float) -> Optional[CostLayer]:
+    """Layer blocking the cells of a mask of the whole grid, None if no cell is blocked"""
+    (xs, ys) = np.nonzero(mask)
+    if len(xs) == 0:
+        return None
+    window = (slice(int(xs.min()), int(xs.max()) + 1), slice(int(ys.min()), int(ys.max()) + 1))
+    return CostLayer(None, window, np.where(mask[window], blocked_cost, 1.0))
+
+class LayeredCostMap:
+    """Cost map of the playing area as the max of the layers of the obstacles.
+
+    A change of a layer only adds its old and new windows to the dirty window, and `compose` only computes the dirty window again.
+    The composed map is a new array each time it changes, so that a planner reading the previous one in another thread is not disturbed.
+
+    Attributes
+    ----------
+    layers: dict[Hashable, CostLayer]
+        Layer of each obstacle blocking the robot now
+
+    dirty: Optional[Window]
+        Window covering the changes, to compute again at the next `compose`
+
+    cost: NDArray[(60, 40), Float]
+        Last composed cost map
+    """
+    resolution: int
+    blocked_cost: float
+    layers: dict[Hashable, CostLayer]
+    dirty: Optional[Window]
+    cost: NDArray[Shape["60,40"], Float]
+
+    def __init__(self, shape: tuple[int, int], resolution: int, blocked_cost: float) -> None:
+        self.resolution = resolution
+        self.blocked_cost = blocked_cost
+        self.layers = {}
+        self.dirty = None
+        self.cost = np.ones(shape)
+
+    def set_layer(self, key: Hashable, layer: Optional[CostLayer]) -> None:
+        """Replace the layer `key`, or remove it if `layer` is None"""
+        previous = self.layers.pop(key, None)
+        if previous is not None:
+            self.dirty = union(self.dirty, previous.window)
+        if layer is not None:
+            self.dirty = union(self.dirty, layer.window)
+            self.layers[key] = layer
+
+    def set_zone(self, key: Hashable, zone: Optional[Zone]) -> None:
+        """Layer `key` blocks the cells of `zone`, or is removed if `zone` is None. Nothing is computed if the zone has not changed."""
+        layer = self.layers.get(key)
+        if zone is not None and layer is not None and layer.geometry == zone.geometry():
+            return
+        if zone is None and layer is None:
+            return
+        self.set_layer(key, None if zone is None else zone_layer(zone, self.resolution, self.blocked_cost))
+
+    def compose(self) -> NDArray[Shape["60,40"], Float]:
+        """Cost map with the last layers, only the dirty window is computed again"""
+        window = self.dirty
+        if window is None:
+            return self.cost
+        cost = self.cost.copy()
+        cost[window] = 1.0
+        for layer in self.layers.values():
+            overlap = intersection(window, layer.window)
+            if overlap is not None:
+                np.maximum(cost[overlap], layer.costs[relative(overlap, layer.window)], out=cost[overlap])
+        self.dirty = None
+        self.cost = cost
+        return cost
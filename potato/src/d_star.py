@@ -1,10 +1,14 @@
 import math
+import time
 import numpy as np
-from nptyping import NDArray, Float, Shape
-from queue import PriorityQueue
-from typing import Self
+from nptyping import NDArray, Bool, Float, Int, Shape, UInt8
+from typing import Any, Callable, Optional, Self
 
-from src.constants import PLAYING_AREA_DEPTH, PLAYING_AREA_WIDTH, D_STAR_FACTOR
+from src.constants import COMPACT_DTYPE, PLAYING_AREA_DEPTH, PLAYING_AREA_WIDTH, D_STAR_FACTOR
+from src.grid_topology import CONNBR_DIRECTIONS, GridTopology, get_grid_topology
+from src.helpers.indexed_heap import IndexedHeap
+from src.replay.base_classes import ReplayEvent, EventType
+from src.replay.save_replay import log_replay
 
 class State:
     value: tuple[int, int]
@@ -32,19 +36,198 @@ class State:
     def to_float(self) -> tuple[float, float]:
         return self.value
     
+# Size of the default planner grid (cells of D_STAR_FACTOR mm). The engines take the size of their grid from the cost map.
 WIDTH = int(PLAYING_AREA_WIDTH / D_STAR_FACTOR)
 DEPTH = int(PLAYING_AREA_DEPTH / D_STAR_FACTOR)
 
-class InterpolatedState(State):
-    float_value: tuple[float, float]
-
-    def __init__(self, x: float, y: float):
-        super().__init__(int(x), int(y))
-        self.float_value = (x,y)
+def heuristic(p: State, q: State) -> float:
+    return round(math.sqrt((p.to_float()[0] - q.to_float()[0]) ** 2 + (p.to_float()[1] - q.to_float()[1]) ** 2), 3)
+
+def build_interpolation_tables(division: int) -> tuple[NDArray[Shape["*, 2"], Float], NDArray[Shape["*, 2"], Int], NDArray[Shape["*, 2"], Int], NDArray[Shape["*"], Float]]:
+    """Candidates of `get_best_interpolated_child`: `division` points on each edge of the square around the cell.
+
+    Returns the offset of each candidate, the offsets of the two cells interpolated (the one in the middle
+    of the edge and the corner on the same side) and the weight of the corner.
+    Candidates are sorted by truncated offset so a single argmin breaks ties like comparing `State` values.
+    """
+    child_offsets: list[tuple[float, float]] = []
+    mid_offsets: list[tuple[int, int]] = []
+    corner_offsets: list[tuple[int, int]] = []
+    corner_weights: list[float] = []
+    for horizontal_edge in [False, True]:
+        for k in range(-division, division + 1):
+            t = k / division
+            side = (k > 0) - (k < 0)
+            for direction in [1, -1]:
+                if horizontal_edge:
+                    child_offsets.append((t, direction))
+                    mid_offsets.append((0, direction))
+                    corner_offsets.append((side, direction))
+                else:
+                    child_offsets.append((direction, t))
+                    mid_offsets.append((direction, 0))
+                    corner_offsets.append((direction, side))
+                corner_weights.append(abs(t))
+    offsets = np.array(child_offsets)
+    order = np.lexsort((np.floor(offsets[:, 1]), np.floor(offsets[:, 0])))
+    return (offsets[order], np.array(mid_offsets)[order], np.array(corner_offsets)[order], np.array(corner_weights)[order])
+
+(CHILD_OFFSETS, MID_OFFSETS, CORNER_OFFSETS, CORNER_WEIGHTS) = build_interpolation_tables(10)
+# The middle of an edge costs 1 plus the rhs of the cell, the other candidates their distance plus the interpolated rhs
+IS_MID = CORNER_WEIGHTS == 0
+
+# During a repair, difference between g and rhs under which a cell is considered consistent.
+# The Field D* interpolated cost lets neighbouring cells lower each other by ever smaller amounts,
+# without it a repair could go on forever.
+REPAIR_TOLERANCE = 1e-3
+# During a repair, the cells with a key up to this margin over the key of `s_start` are made consistent too.
+# The path extraction reads the cells next to the path, their key is usually in this band.
+REPAIR_MARGIN = 0.25
+
+def get_best_interpolated_child(rhs: NDArray[Shape["60,40"], Float], position: tuple[float, float]) -> tuple[float, float]:
+    """Best point on the square around the cell of `position`, using the rhs interpolated along the edges"""
+    (width, depth) = rhs.shape
+    x = int(position[0])
+    y = int(position[1])
+    children = CHILD_OFFSETS + (x, y)
+    valid = (children[:, 0] >= 0) & (children[:, 0] <= width - 1) & (children[:, 1] >= 0) & (children[:, 1] <= depth - 1)
+    mid = rhs[np.clip(x + MID_OFFSETS[:, 0], 0, width - 1), np.clip(y + MID_OFFSETS[:, 1], 0, depth - 1)]
+    corner = rhs[np.clip(x + CORNER_OFFSETS[:, 0], 0, width - 1), np.clip(y + CORNER_OFFSETS[:, 1], 0, depth - 1)]
+    with np.errstate(invalid="ignore"):
+        distance = np.round(np.hypot(children[:, 0] - position[0], children[:, 1] - position[1]), 3)
+        costs = np.where(IS_MID, 1 + mid, distance + CORNER_WEIGHTS * corner + (1 - CORNER_WEIGHTS) * mid)
+    costs[~valid] = np.nan
+    best = np.nanargmin(costs)
+    return (float(children[best, 0]), float(children[best, 1]))
+
+def get_interpolated_path(rhs: NDArray[Shape["60,40"], Float], s_start: State, s_goal: State) -> NDArray[Shape["*, 2"], Float]:
+    """Path from `s_start` to the cell of `s_goal` as an (N, 2) array of grid coordinates
+
+    Raises a `ValueError` if the goal is not reached after as many steps as there are cells,
+    which happens when the rhs leads in circles.
+    """
+    position = s_start.to_float()
+    path = [position]
+    while (int(position[0]), int(position[1])) != s_goal.value:
+        if len(path) > rhs.size:
+            raise ValueError(f"No path from {s_start} to {s_goal}")
+        position = get_best_interpolated_child(rhs, position)
+        path.append(position)
+    return np.array(path, dtype=float)
+
+# Whether the planners created from now on collect counters and timings (see `Instrumentation`)
+instrumentation_enabled = False
+
+def set_instrumentation(enabled: bool) -> None:
+    global instrumentation_enabled
+    instrumentation_enabled = enabled
+
+class Instrumentation:
+    """Counters and timings of one planner, sent as `PLANNER_STATS` replay events.
+
+    The methods of the planner are wrapped on the instance only, so a planner without instrumentation
+    (created while it is disabled, or after `detach`) runs the methods of its class without any overhead.
+    Each outermost phase (compute, path extraction, obstacle repair) sends one event with its duration
+    and the counters since the previous event: expansions, `update_vertex` calls, `c()` evaluations, largest open list.
+
+    Attributes
+    ----------
+    update_vertex_calls: int
+        Calls to `update_vertex` (or `repair_vertex`) since the last event
+
+    c_evaluations: int
+        Evaluations of the interpolated cost `c()` since the last event
+
+    max_queue_size: int
+        Largest size of the open list since the last event
+
+    timings: dict[str, float]
+        Total time spent in each phase (in seconds)
+    """
+    PHASES = {
+        "compute_shortest_path": "compute",
+        "get_path": "path_extraction",
+        "add_obstacles": "obstacle_repair",
+        "repair": "obstacle_repair",
+    }
+    COUNTED = ["update_vertex", "repair_vertex"]
+
+    planner: Any
+    emit: Callable[[ReplayEvent], None]
+    update_vertex_calls: int
+    c_evaluations: int
+    max_queue_size: int
+    timings: dict[str, float]
+
+    def __init__(self, planner: Any, emit: Callable[[ReplayEvent], None] = log_replay) -> None:
+        self.planner = planner
+        self.emit = emit
+        self.timings = {}
+        self.depth = 0
+        self.reset()
+        self.attach()
+
+    def reset(self) -> None:
+        self.update_vertex_calls = 0
+        self.c_evaluations = 0
+        self.max_queue_size = len(self.planner.u)
+        self.expansions = self.planner.expansions
+
+    def attach(self) -> None:
+        for (name, phase) in self.PHASES.items():
+            if hasattr(self.planner, name):
+                setattr(self.planner, name, self.timed(getattr(self.planner, name), phase))
+        for name in self.COUNTED:
+            if hasattr(self.planner, name):
+                setattr(self.planner, name, self.counted(getattr(self.planner, name)))
+        c = self.planner.c
+        def counted_c(*args: Any) -> float:
+            self.c_evaluations += 1
+            return c(*args)
+        self.planner.c = counted_c
+
+    def detach(self) -> None:
+        """Give the planner back the methods of its class"""
+        for name in [*self.PHASES, *self.COUNTED, "c"]:
+            self.planner.__dict__.pop(name, None)
+
+    def counted(self, method: Callable[..., None]) -> Callable[..., None]:
+        def wrapper(*args: Any) -> None:
+            self.update_vertex_calls += 1
+            method(*args)
+            self.max_queue_size = max(self.max_queue_size, len(self.planner.u))
+        return wrapper
+
+    def timed(self, method: Callable[..., Any], phase: str) -> Callable[..., Any]:
+        def wrapper(*args: Any) -> Any:
+            self.depth += 1
+            begin = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                duration = time.perf_counter() - begin
+                self.depth -= 1
+                if self.depth == 0:
+                    self.timings[phase] = self.timings.get(phase, 0) + duration
+                    self.report(phase, duration)
+        return wrapper
+
+    def report(self, phase: str, duration: float) -> None:
+        self.emit(
+            ReplayEvent(
+                event=EventType.PLANNER_STATS,
+                stats={
+                    "phase": phase,
+                    "duration": duration,
+                    "expansions": self.planner.expansions - self.expansions,
+                    "update_vertex_calls": self.update_vertex_calls,
+                    "c_evaluations": self.c_evaluations,
+                    "max_queue_size": self.max_queue_size,
+                }
+            )
+        )
+        self.reset()
 
-    def to_float(self) -> tuple[float, float]:
-        return self.float_value
-    
 class DStarLight:
     rhs: NDArray[Shape["60,40"], Float]
     g: NDArray[Shape["60,40"], Float]
@@ -52,56 +235,47 @@ class DStarLight:
     s_goal: State
     s_last: State
     k_m: float
-    u: PriorityQueue[tuple[tuple[float, float], State]] 
+    u: IndexedHeap[tuple[float, float], State]
     costs: NDArray[Shape["60,40"], Float]
-    path: list[State]
-    points_in_u: dict[State, tuple[float, float]]
-    connbr: dict[State, list[tuple[State, State]]]
-    path: list[State]
+    path: NDArray[Shape["*, 2"], Float]
+    expansions: int
+    topology: GridTopology
+    connbr: NDArray[Shape["2400"], UInt8]
     recomputed: set[State]
+    instrumentation: Optional[Instrumentation]
 
 
     def heuristic(self, p: State, q: State) -> float:
-        return round(math.sqrt((p.to_float()[0] - q.to_float()[0]) ** 2 + (p.to_float()[1] - q.to_float()[1]) ** 2), 3)
+        return heuristic(p, q)
 
     def calculate_key(self, s: State) -> tuple[float, float]:
         return (min(self.g[s.value],self.rhs[s.value]) + self.heuristic(self.s_start, s) + self.k_m , min(self.g[s.value], self.rhs[s.value]))
     
     def __init__(self, s_start: State, s_goal: State, costs: NDArray[Shape["300,200"], Float]) -> None:
         self.recomputed = set()
-        self.connbr = {}
-        self.u = PriorityQueue()
-        self.points_in_u = {}
-        self.path = []
+        self.topology = get_grid_topology(*costs.shape)
+        self.connbr = np.zeros(self.topology.size, dtype=np.uint8)
+        self.u = IndexedHeap()
+        self.expansions = 0
+        self.path = np.empty((0, 2))
         self.k_m = 0
         self.s_start = s_start
         self.s_goal = s_goal
         self.costs = costs
-        self.rhs = np.ones((WIDTH,DEPTH)) * np.inf
-        self.g = np.ones((WIDTH,DEPTH)) * np.inf
+        self.rhs = np.ones(costs.shape) * np.inf
+        self.g = np.ones(costs.shape) * np.inf
         self.rhs[self.s_goal.value] = 0
-        goal_key = self.calculate_key(self.s_goal)
-        self.points_in_u[self.s_goal] = goal_key
-        self.u.put_nowait((goal_key, self.s_goal))
+        self.u.push(self.s_goal, self.calculate_key(self.s_goal))
+        self.instrumentation = Instrumentation(self) if instrumentation_enabled else None
 
-    def state_is_valid(self, u: State) -> bool:
-        (x, y) = u.to_float()
-        return 0 <= x <= WIDTH - 1 and 0 <= y <= DEPTH - 1
+    def to_id(self, s: State) -> int:
+        return self.topology.to_id(*s.value)
+
+    def to_state(self, s: int) -> State:
+        return State(*self.topology.coordinates(s))
 
     def prev(self, u: State) -> list[State]:
-        (x, y) = u.value
-        prevs = [
-            State(x-1, y-1),
-            State(x+1, y+1),
-            State(x+1, y-1),
-            State(x-1, y+1),
-            State(x, y-1),
-            State(x, y+1),
-            State(x+1, y),
-            State(x-1, y),
-        ]
-
-        return list(filter(lambda u: self.state_is_valid(u), prevs))
+        return [self.to_state(prev) for prev in self.topology.prev(self.to_id(u))]
     
     def is_diagonal(self, s1: State, s2: State) -> bool:
         diff_x = abs(s2.value[0] - s1.value[0])
@@ -138,101 +312,39 @@ class DStarLight:
 
         return v_s
     
-    def connbrs(self, s:State, after_obstacle: bool) -> list[tuple[State, State]]:
-        nbrs: list[tuple[State, State]] = []
-
-        s_1 = State(s.value[0] + 1, s.value[1])
-        s_2 =  State(s.value[0] + 1, s.value[1] + 1)
-        s_3 =  State(s.value[0], s.value[1] + 1)
-        s_4 =  State(s.value[0] - 1, s.value[1] + 1)
-        s_5 =  State(s.value[0] - 1, s.value[1])
-        s_6 =  State(s.value[0] - 1, s.value[1] - 1)
-        s_7 =  State(s.value[0], s.value[1] - 1)
-        s_8 =  State(s.value[0] + 1, s.value[1] - 1)
-
-        if not after_obstacle:
-            if s in self.connbr:
-                return self.connbr[s]
-
-            if self.state_is_valid(s_1) and self.state_is_valid(s_2) and (s_1 in s.succs or s_2 in s.succs):
-                nbrs.append((s_1, s_2))
-
-            if self.state_is_valid(s_2) and self.state_is_valid(s_3) and (s_2 in s.succs or s_3 in s.succs):
-                nbrs.append((s_2, s_3))
-
-            if self.state_is_valid(s_3) and self.state_is_valid(s_4) and (s_3 in s.succs or s_4 in s.succs):
-                nbrs.append((s_3, s_4))
-
-            if self.state_is_valid(s_4) and self.state_is_valid(s_5) and (s_4 in s.succs or s_5 in s.succs):
-                nbrs.append((s_4, s_5))
-
-            if self.state_is_valid(s_5) and self.state_is_valid(s_6) and (s_5 in s.succs or s_6 in s.succs):
-                nbrs.append((s_5, s_6))
-
-            if self.state_is_valid(s_6) and self.state_is_valid(s_7) and (s_6 in s.succs or s_7 in s.succs):
-                nbrs.append((s_6, s_7))
-
-            if self.state_is_valid(s_7) and self.state_is_valid(s_8) and (s_7 in s.succs or s_8 in s.succs):
-                nbrs.append((s_7, s_8))
-
-            if self.state_is_valid(s_8) and self.state_is_valid(s_1) and (s_8 in s.succs or s_1 in s.succs):
-                nbrs.append((s_8, s_1))
-
-            self.connbr[s] = nbrs
-            return nbrs
+    def connbrs(self, s: State, after_obstacle: bool) -> list[tuple[State, State]]:
+        """Pairs of consecutive neighbours of `s`.
+
+        Before any obstacle, only the pairs containing a known successor are kept (the result is cached in `connbr`).
+        After an obstacle, all the valid pairs are used.
+        """
+        u = self.to_id(s)
+        if not after_obstacle and self.connbr[u] != 0:
+            mask = self.connbr[u]
         else:
-            if self.state_is_valid(s_1) and self.state_is_valid(s_2):
-                nbrs.append((s_1, s_2))
-
-            if self.state_is_valid(s_2) and self.state_is_valid(s_3):
-                nbrs.append((s_2, s_3))
-
-            if self.state_is_valid(s_3) and self.state_is_valid(s_4):
-                nbrs.append((s_3, s_4))
-
-            if self.state_is_valid(s_4) and self.state_is_valid(s_5):
-                nbrs.append((s_4, s_5))
-
-            if self.state_is_valid(s_5) and self.state_is_valid(s_6):
-                nbrs.append((s_5, s_6))
-
-            if self.state_is_valid(s_6) and self.state_is_valid(s_7):
-                nbrs.append((s_6, s_7))
-
-            if self.state_is_valid(s_7) and self.state_is_valid(s_8):
-                nbrs.append((s_7, s_8))
-
-            if self.state_is_valid(s_8) and self.state_is_valid(s_1):
-                nbrs.append((s_8, s_1))
-
-            self.connbr[s] = nbrs
-            return nbrs
+            succs = 0
+            for succ in s.succs:
+                succs |= 1 << CONNBR_DIRECTIONS.index((succ.value[0] - s.value[0], succ.value[1] - s.value[1]))
+            mask = self.topology.connected_pairs(u, 0xFF if after_obstacle else succs)
+            self.connbr[u] = mask
+        return [(self.to_state(u + s_1), self.to_state(u + s_2)) for (s_1, s_2) in self.topology.pairs_by_mask[mask]]
 
     def update_vertex(self, u: State, after_obstacle: bool) -> None:
         if u.value != self.s_goal.value:
             min_value = min([self.c(u, s_prime, s_prime_prime) for (s_prime, s_prime_prime) in self.connbrs(u, after_obstacle)])
             self.rhs[u.value] = min_value
 
-        try:
-            key = self.points_in_u[u]
-            self.u.queue.remove((key, u))
-        except:
-            pass
-                
-        if self.g[u.value] != self.rhs[u.value]:
-            key = self.calculate_key(u)
-            u_key = key
-            if (u_key, u) not in self.u.queue:
-                self.points_in_u[u] = key
-                if u not in self.recomputed:
-                    self.u.put_nowait((key, u))
-                    if after_obstacle:
-                        self.recomputed.add(u)
+        if self.g[u.value] != self.rhs[u.value] and u not in self.recomputed:
+            self.u.push(u, self.calculate_key(u))
+            if after_obstacle:
+                self.recomputed.add(u)
+        elif u in self.u:
+            self.u.remove(u)
 
     def compute_shortest_path(self, after_obstacle: bool):
-        while self.u.queue[0][0] < self.calculate_key(self.s_start) or self.rhs[self.s_start.value] != self.g[self.s_start.value]:
-            _, u = self.u.get_nowait()
-            self.points_in_u.pop(u)
+        while len(self.u) > 0 and (self.u.top_key() < self.calculate_key(self.s_start) or self.rhs[self.s_start.value] != self.g[self.s_start.value]):
+            _, u = self.u.pop()
+            self.expansions += 1
             if self.g[u.value] > self.rhs[u.value]:
                 self.g[u.value] = self.rhs[u.value]
 
@@ -240,76 +352,16 @@ class DStarLight:
                 for prev in previouses:
                     prev.succs.append(u)
                     self.update_vertex(prev, after_obstacle)
-        self.u.queue = []
-        self.points_in_u = {}
-
-    def get_best_interpolated_child(self, s: State) -> InterpolatedState:
-        interpolated_children: PriorityQueue[tuple[float, InterpolatedState]] = PriorityQueue()
-        x, y = s.value
-        division = 10
-        for j in range(-division,division + 1):
-            child = InterpolatedState(x+1, y + j/division)
-            if self.state_is_valid(child):
-                if j < 0:
-                    cost = self.heuristic(child, s) + abs(j/division) * self.rhs[x+1,y-1] + (1-abs(j/division)) * self.rhs[x+1, y]
-                elif j > 0:
-                    cost = self.heuristic(child, s) + abs(j/division) * self.rhs[x+1, y+1] + (1-abs(j/division)) * self.rhs[x+1, y]
-                else:
-                    cost = 1 + self.rhs[x+1, y]
-                if not math.isnan(cost):
-                    interpolated_children.put_nowait((cost, child))
-            
-            child = InterpolatedState(x-1, y+j/division)
-            if self.state_is_valid(child):
-                if j < 0:
-                    cost = self.heuristic(child, s) + abs(j/division) * self.rhs[x-1,y-1] + (1-abs(j/division)) * self.rhs[x-1, y]
-                elif j > 0:
-                    cost = self.heuristic(child, s) + abs(j/division) * self.rhs[x-1, y+1] + (1-abs(j/division)) * self.rhs[x-1, y]
-                else:
-                    cost = 1 + self.rhs[x-1, y]
-                if not math.isnan(cost):
-                    interpolated_children.put_nowait((cost, child))
-
-
-        for i in range(-division,division + 1):
-            child = InterpolatedState(x + i /division, y + 1)
-            if self.state_is_valid(child):
-                if i < 0:
-                    cost = self.heuristic(child, s) + abs(i/division) * self.rhs[x-1,y+1] + (1-abs(i/division)) * self.rhs[x, y+1]
-                elif i > 0:
-                    cost = self.heuristic(child, s) + abs(i/division) * self.rhs[x+1, y+1] + (1-abs(i/division)) * self.rhs[x, y+1]
-                else:
-                    cost = 1 + self.rhs[x, y + 1]
-                if not math.isnan(cost):
-                    interpolated_children.put_nowait((cost, child))
-            
-            child = InterpolatedState(x + i /division, y - 1)
-            if self.state_is_valid(child):
-                if i < 0:
-                    cost = self.heuristic(child, s) + abs(i/division) * self.rhs[x-1,y-1] + (1-abs(i/division)) * self.rhs[x, y-1]
-                elif i > 0:
-                    cost = self.heuristic(child, s) + abs(i/division) * self.rhs[x+1, y-1] + (1-abs(i/division)) * self.rhs[x, y-1]
-                else:
-                    cost = 1 + self.rhs[x, y - 1]
-                if not math.isnan(cost):
-                    interpolated_children.put_nowait((cost, child))
+        self.u.clear()
 
-        (_, best) = interpolated_children.get_nowait()
-        return best
-    
-    def get_path(self) -> list[State]:
-        s = self.s_start
-        path = [s]
-        while s != self.s_goal:
-            s = self.get_best_interpolated_child(s)
-            path.append(s)
-        self.path = path
-        return path
+    def get_path(self) -> NDArray[Shape["*, 2"], Float]:
+        self.path = get_interpolated_path(self.rhs, self.s_start, self.s_goal)
+        return self.path
         
     def add_obstacles(self, obstacles: list[State]):
         self.g[self.s_start.value] = np.inf
         self.rhs[self.s_start.value] = np.inf
-        path_int = list(map(lambda x: x.value, self.path))
+        path_int = [(int(x), int(y)) for (x, y) in self.path]
         obstacle_int = list(map(lambda x: x.value, obstacles))
         intersection = set(path_int).intersection(obstacle_int)
         if len(intersection) > 0:
@@ -325,4 +377,223 @@ class DStarLight:
                 self.update_vertex(s, True)
                 for neighbour in self.prev(s):
                     self.update_vertex(neighbour, True)
-            self.compute_shortest_path(True)
\ No newline at end of file
+            self.compute_shortest_path(True)
+
+class ArrayDStarLight:
+    """D* Lite engine where a cell is a flat integer id (x * depth + y) instead of a `State` object.
+
+    g, rhs, costs and the successor bitmasks are preallocated NumPy arrays indexed by the id,
+    the neighbourhood tables come from the `GridTopology` shared by every planner of the same grid.
+    The steps (keys, tie breaking, Field D* cost, obstacle handling) are the same as `DStarLight`,
+    so both engines return the same path and one can be swapped for the other.
+
+    The grid has the size of `costs`, so the same engine plans on grids of any resolution.
+    With `dtype=COMPACT_DTYPE` and a compact cost map (`PlayingArea.costs_at_resolution(..., compact=True)`), g, rhs and costs
+    take half the memory. The paths are the same, except when two keys are equal in float64:
+    the rounding can order them the other way and the path then takes another route of about the same cost.
+
+    `repair` is specific to this engine: it keeps the planner alive during a match by updating
+    only the part of the search affected by a cost change.
+    """
+    rhs: NDArray[Shape["60,40"], Float]
+    g: NDArray[Shape["60,40"], Float]
+    s_start: State
+    s_goal: State
+    k_m: float
+    u: IndexedHeap[tuple[float, float], int]
+    costs: NDArray[Shape["60,40"], Float]
+    expansions: int
+    topology: GridTopology
+    succs: NDArray[Shape["2400"], UInt8]
+    connbr: NDArray[Shape["2400"], UInt8]
+    recomputed: NDArray[Shape["2400"], Bool]
+    path: NDArray[Shape["*, 2"], Float]
+    instrumentation: Optional[Instrumentation]
+
+    def __init__(self, s_start: State, s_goal: State, costs: NDArray[Shape["60,40"], Float], dtype: type = np.float64) -> None:
+        """`dtype` is the type of g and rhs. The interpolation is computed with Python floats whatever the type,
+        only the stored values are rounded."""
+        self.topology = get_grid_topology(*costs.shape)
+        self.connbr = np.zeros(self.topology.size, dtype=np.uint8)
+        self.succs = np.zeros(self.topology.size, dtype=np.uint8)
+        self.recomputed = np.zeros(self.topology.size, dtype=bool)
+        self.u = IndexedHeap()
+        self.expansions = 0
+        self.path = np.empty((0, 2))
+        self.k_m = 0
+        self.s_start = s_start
+        self.s_goal = s_goal
+        self.costs = costs
+        self._costs = np.ravel(costs)
+        # 2D views on the flat arrays, so they can be read like the ones of `DStarLight`
+        self._rhs = np.full(self.topology.size, np.inf, dtype=dtype)
+        self._g = np.full(self.topology.size, np.inf, dtype=dtype)
+        self.rhs = self._rhs.reshape(costs.shape)
+        self.g = self._g.reshape(costs.shape)
+        goal = self.to_id(self.s_goal)
+        self._rhs[goal] = 0
+        self.u.push(goal, self.calculate_key(goal))
+        self.instrumentation = Instrumentation(self) if instrumentation_enabled else None
+
+    def to_id(self, s: State) -> int:
+        return self.topology.to_id(*s.value)
+
+    def heuristic(self, s: int) -> float:
+        """Heuristic between `s_start` and the cell `s`"""
+        (x_start, y_start) = self.s_start.to_float()
+        (x, y) = self.topology.coordinates(s)
+        return round(math.sqrt((x_start - x) ** 2 + (y_start - y) ** 2), 3)
+
+    def calculate_key(self, s: int) -> tuple[float, float]:
+        k = float(min(self._g[s], self._rhs[s]))
+        return (k + self.heuristic(s) + self.k_m, k)
+
+    def prev(self, u: int) -> list[int]:
+        return self.topology.prev(u)
+
+    def array_bytes(self) -> dict[str, int]:
+        """Size in bytes of the arrays of the planner"""
+        return {
+            "g": self._g.nbytes,
+            "rhs": self._rhs.nbytes,
+            "costs": self.costs.nbytes,
+            "succs": self.succs.nbytes,
+            "connbr": self.connbr.nbytes,
+            "recomputed": self.recomputed.nbytes,
+        }
+
+    def connbrs(self, s: int, after_obstacle: bool) -> list[tuple[int, int]]:
+        """Id offsets of the pairs of consecutive neighbours (cardinal one first, diagonal one second) of `s`.
+        
+        Before any obstacle, only the pairs containing a known successor are kept (the result is cached in `connbr`).
+        After an obstacle, all the valid pairs are used.
+        """
+        if not after_obstacle and self.connbr[s] != 0:
+            mask = self.connbr[s]
+        else:
+            mask = self.topology.connected_pairs(s, 0xFF if after_obstacle else int(self.succs[s]))
+            self.connbr[s] = mask
+        return self.topology.pairs_by_mask[mask]
+
+    def c(self, s: int, s_1: int, s_2: int) -> float:
+        """Field D* interpolated cost of `s` through the edge between the cardinal neighbour `s_1` and the diagonal one `s_2`"""
+        # Python floats: the interpolation has the same precision whatever the type of the arrays, inf included
+        cost = float(self._costs[s])
+        if cost == math.inf:
+            return math.inf
+        g_1 = float(self._g[s_1])
+        g_2 = float(self._g[s_2])
+        if g_1 <= g_2:
+            return cost + g_1
+        f = g_1 - g_2
+        if f <= cost:
+            if cost <= f:
+                return cost * math.sqrt(2) + g_2
+            y = min(f / math.sqrt(cost*cost-f*f), 1)
+            return cost * math.sqrt(1 + y*y) + f * (1-y) + g_2
+        return cost * math.sqrt(2) + g_2
+
+    def update_vertex(self, u: int, after_obstacle: bool) -> None:
+        if u != self.to_id(self.s_goal):
+            self._rhs[u] = min([self.c(u, u + s_1, u + s_2) for (s_1, s_2) in self.connbrs(u, after_obstacle)])
+
+        if self._g[u] != self._rhs[u] and not self.recomputed[u]:
+            self.u.push(u, self.calculate_key(u))
+            if after_obstacle:
+                self.recomputed[u] = True
+        elif u in self.u:
+            self.u.remove(u)
+
+    def compute_shortest_path(self, after_obstacle: bool):
+        start = self.to_id(self.s_start)
+        while len(self.u) > 0 and (self.u.top_key() < self.calculate_key(start) or self._rhs[start] != self._g[start]):
+            _, u = self.u.pop()
+            self.expansions += 1
+            if self._g[u] > self._rhs[u]:
+                self._g[u] = self._rhs[u]
+
+                for (offset, successor_bit) in self.topology.prevs_by_mask[self.topology.valid_prevs[u]]:
+                    prev = u + offset
+                    self.succs[prev] |= successor_bit
+                    self.update_vertex(prev, after_obstacle)
+        self.u.clear()
+
+    def get_path(self) -> NDArray[Shape["*, 2"], Float]:
+        self.path = get_interpolated_path(self.rhs, self.s_start, self.s_goal)
+        return self.path
+
+    def add_obstacles(self, obstacles: list[State]):
+        start = self.to_id(self.s_start)
+        self._g[start] = np.inf
+        self._rhs[start] = np.inf
+        path_int = [(int(x), int(y)) for (x, y) in self.path]
+        obstacle_int = list(map(lambda x: x.value, obstacles))
+        intersection = set(path_int).intersection(obstacle_int)
+        if len(intersection) > 0:
+            self.k_m += heuristic(self.s_start, self.s_goal)
+            for point in obstacles:
+                s = self.to_id(point)
+                self._rhs[s] = np.inf
+                self._g[s] = np.inf
+                for neighbour in self.prev(s):
+                    self._rhs[neighbour] = np.inf
+                    self._g[neighbour] = np.inf
+            for point in intersection:
+                s = self.topology.to_id(*point)
+                self.update_vertex(s, True)
+                for neighbour in self.prev(s):
+                    self.update_vertex(neighbour, True)
+            self.compute_shortest_path(True)
+
+    def repair_vertex(self, u: int) -> None:
+        """`update_vertex` used by `repair`: a cell is consistent when its g and rhs differ by less than `REPAIR_TOLERANCE`"""
+        if u != self.to_id(self.s_goal):
+            self._rhs[u] = min([self.c(u, u + s_1, u + s_2) for (s_1, s_2) in self.connbrs(u, False)], default=np.inf)
+
+        if abs(self._g[u] - self._rhs[u]) > REPAIR_TOLERANCE:
+            self.u.push(u, self.calculate_key(u))
+        elif u in self.u:
+            self.u.remove(u)
+
+    def repair(self, cells: list[State]) -> None:
+        """Update the search after the cost of `cells` changed (increase or decrease) or `s_start` moved.
+
+        Unlike `add_obstacles`, the cells which do not depend on the changed ones keep their g,
+        so the work depends on the size of the change and not on the size of the grid.
+        """
+        start = self.to_id(self.s_start)
+        # The open list is emptied at the end of each search, the cells left inconsistent are put back.
+        # Their keys are computed with the current `s_start`, so `k_m` does not change.
+        with np.errstate(invalid="ignore"):
+            inconsistent = np.flatnonzero(np.abs(self._g - self._rhs) > REPAIR_TOLERANCE)
+        for u in inconsistent.tolist():
+            self.u.push(u, self.calculate_key(u))
+        for cell in cells:
+            u = self.to_id(cell)
+            # The cached pairs only go around the first successor, which can be blocked now
+            self.connbr[u] = self.topology.connected_pairs(u, 0xFF)
+            self.repair_vertex(u)
+
+        # The path is extracted from the rhs of the cells around it, not only from the cells used by `s_start`.
+        # The search goes on until the cells next to the path are consistent too.
+        while len(self.u) > 0 and (self.u.top_key()[0] <= self.calculate_key(start)[0] + REPAIR_MARGIN or abs(self._g[start] - self._rhs[start]) > REPAIR_TOLERANCE):
+            _, u = self.u.pop()
+            self.expansions += 1
+            if self._g[u] > self._rhs[u]:
+                self._g[u] = self._rhs[u]
+                for (offset, successor_bit) in self.topology.prevs_by_mask[self.topology.valid_prevs[u]]:
+                    prev = u + offset
+                    self.succs[prev] |= successor_bit
+                    self.repair_vertex(prev)
+            else:
+                self.raise_cell(u)
+        self.u.clear()
+
+    def raise_cell(self, u: int) -> None:
+        """Forget the g of `u` whose cost to go increased, and update the cells which could depend on it"""
+        self._g[u] = np.inf
+        self.repair_vertex(u)
+        for prev in self.prev(u):
+            # The pairs around the first successor can go through `u`, all the pairs are used instead
+            self.connbr[prev] = self.topology.connected_pairs(prev, 0xFF)
+            self.repair_vertex(prev)
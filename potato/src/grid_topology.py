@@ -0,0 +1,120 @@
+from functools import cache
+import numpy as np
+from nptyping import NDArray, Bool, Int, Shape, UInt8
+
+# Neighbours in the order used by `DStarLight.prev`
+PREV_DIRECTIONS = [(-1, -1), (1, 1), (1, -1), (-1, 1), (0, -1), (0, 1), (1, 0), (-1, 0)]
+# Neighbours in the order used by `DStarLight.connbrs`, two consecutive ones form a pair.
+# Even directions are the cardinal ones, odd directions the diagonal ones.
+CONNBR_DIRECTIONS = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+
+def pairs_with_successors(succs: int) -> int:
+    """Bitmask of the pairs (k, k + 1) containing at least one direction of the bitmask `succs`"""
+    mask = 0
+    for k in range(8):
+        if succs & ((1 << k) | (1 << ((k + 1) % 8))):
+            mask |= 1 << k
+    return mask
+
+# Pairs with a successor for every possible successor bitmask
+PAIRS_WITH_SUCCESSORS = [pairs_with_successors(succs) for succs in range(256)]
+
+class GridTopology:
+    """Neighbourhood tables of a planner grid of `width` x `depth` cells.
+
+    A cell (x, y) has the id x * depth + y. The tables only depend on the size of the grid,
+    so they are built once by `get_grid_topology` and shared by every planner working on this grid.
+
+    Attributes
+    ----------
+    neighbours: NDArray[(size, 8), Int]
+        Id of each neighbour in the `CONNBR_DIRECTIONS` order, -1 if it is outside of the grid
+
+    valid_neighbours: NDArray[(size,), UInt8]
+        Bitmask of the neighbours inside the grid (bit k for `CONNBR_DIRECTIONS[k]`)
+
+    valid_pairs: NDArray[(size,), UInt8]
+        Bitmask of the pairs (k, k + 1) whose two neighbours are inside the grid
+
+    on_border: NDArray[(size,), Bool]
+        Whether the cell has at least one neighbour outside of the grid
+
+    valid_prevs: NDArray[(size,), UInt8]
+        Bitmask of the neighbours inside the grid, in the `PREV_DIRECTIONS` order
+
+    prevs_by_mask: list[list[tuple[int, int]]]
+        For each bitmask of `valid_prevs`, the id offset of the neighbours and the bit of the cell in their successor bitmask
+
+    pairs_by_mask: list[list[tuple[int, int]]]
+        For each pair bitmask, the id offsets of the (cardinal, diagonal) neighbours of the pairs
+    """
+    width: int
+    depth: int
+    size: int
+    neighbours: NDArray[Shape["*, 8"], Int]
+    valid_neighbours: NDArray[Shape["*"], UInt8]
+    valid_pairs: NDArray[Shape["*"], UInt8]
+    on_border: NDArray[Shape["*"], Bool]
+    valid_prevs: NDArray[Shape["*"], UInt8]
+    prevs_by_mask: list[list[tuple[int, int]]]
+    pairs_by_mask: list[list[tuple[int, int]]]
+
+    def __init__(self, width: int, depth: int) -> None:
+        self.width = width
+        self.depth = depth
+        self.size = width * depth
+
+        x, y = np.divmod(np.arange(self.size), depth)
+        self.neighbours = np.full((self.size, 8), -1)
+        self.valid_neighbours = np.zeros(self.size, dtype=np.uint8)
+        for k, (dx, dy) in enumerate(CONNBR_DIRECTIONS):
+            inside = (0 <= x + dx) & (x + dx <= width - 1) & (0 <= y + dy) & (y + dy <= depth - 1)
+            self.neighbours[inside, k] = (x[inside] + dx) * depth + y[inside] + dy
+            self.valid_neighbours[inside] |= np.uint8(1 << k)
+        self.on_border = self.valid_neighbours != 0xFF
+        self.valid_pairs = np.zeros(self.size, dtype=np.uint8)
+        for k in range(8):
+            pair = (1 << k) | (1 << ((k + 1) % 8))
+            self.valid_pairs[(self.valid_neighbours & pair) == pair] |= np.uint8(1 << k)
+
+        self.valid_prevs = np.zeros(self.size, dtype=np.uint8)
+        for i, direction in enumerate(PREV_DIRECTIONS):
+            inside = (self.valid_neighbours & (1 << CONNBR_DIRECTIONS.index(direction))) != 0
+            self.valid_prevs[inside] |= np.uint8(1 << i)
+        prevs = [
+            (dx * depth + dy, 1 << CONNBR_DIRECTIONS.index((-dx, -dy)))
+            for (dx, dy) in PREV_DIRECTIONS
+        ]
+        self.prevs_by_mask = [
+            [prevs[i] for i in range(8) if mask & (1 << i)]
+            for mask in range(256)
+        ]
+
+        offsets = [dx * depth + dy for (dx, dy) in CONNBR_DIRECTIONS]
+        # (cardinal, diagonal) offsets of pair k
+        pair_offsets = [
+            (offsets[k], offsets[(k + 1) % 8]) if k % 2 == 0 else (offsets[(k + 1) % 8], offsets[k])
+            for k in range(8)
+        ]
+        self.pairs_by_mask = [
+            [pair_offsets[k] for k in range(8) if mask & (1 << k)]
+            for mask in range(256)
+        ]
+
+    def to_id(self, x: int, y: int) -> int:
+        return x * self.depth + y
+
+    def coordinates(self, s: int) -> tuple[int, int]:
+        return divmod(s, self.depth)
+
+    def prev(self, u: int) -> list[int]:
+        """Neighbours of `u` inside the grid, in the `PREV_DIRECTIONS` order"""
+        return [u + offset for (offset, _) in self.prevs_by_mask[self.valid_prevs[u]]]
+
+    def connected_pairs(self, s: int, succs: int) -> int:
+        """Bitmask of the pairs of `s` inside the grid containing one of the successors `succs`"""
+        return int(self.valid_pairs[s]) & PAIRS_WITH_SUCCESSORS[succs]
+
+@cache
+def get_grid_topology(width: int, depth: int) -> GridTopology:
+    return GridTopology(width, depth)
@@ -0,0 +1,123 @@
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K")
+T = TypeVar("T", bound=Hashable)
+
+class IndexedHeap(Generic[K, T]):
+    """Binary min-heap of (key, item) with a map from each item to its position in the heap.
+
+    An item is present at most once. Inserting, changing the key of and removing an item are O(log n).
+    Ties on the key are broken by comparing the items.
+
+    Attributes
+    ----------
+    pushes, pops, updates, removes: int
+        Number of heap operations since the creation of the heap
+    """
+    _heap: list[tuple[K, T]]
+    _positions: dict[T, int]
+    pushes: int
+    pops: int
+    updates: int
+    removes: int
+
+    def __init__(self) -> None:
+        self._heap = []
+        self._positions = {}
+        self.pushes = 0
+        self.pops = 0
+        self.updates = 0
+        self.removes = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._positions
+
+    def operations(self) -> int:
+        """Total number of heap operations"""
+        return self.pushes + self.pops + self.updates + self.removes
+
+    def key(self, item: T) -> K:
+        return self._heap[self._positions[item]][0]
+
+    def top(self) -> tuple[K, T]:
+        return self._heap[0]
+
+    def top_key(self) -> K:
+        return self._heap[0][0]
+
+    def push(self, item: T, key: K) -> None:
+        """Insert the item, or change its key if it is already in the heap"""
+        if item in self._positions:
+            self.updates += 1
+            position = self._positions[item]
+            previous_key = self._heap[position][0]
+            self._heap[position] = (key, item)
+            if (key, item) < (previous_key, item): # type: ignore
+                self._sift_up(position)
+            else:
+                self._sift_down(position)
+        else:
+            self.pushes += 1
+            self._heap.append((key, item))
+            self._positions[item] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+
+    def pop(self) -> tuple[K, T]:
+        self.pops += 1
+        entry = self._heap[0]
+        self._remove_at(0)
+        return entry
+
+    def remove(self, item: T) -> None:
+        self.removes += 1
+        self._remove_at(self._positions[item])
+
+    def clear(self) -> None:
+        self._heap = []
+        self._positions = {}
+
+    def _remove_at(self, position: int) -> None:
+        (_, item) = self._heap[position]
+        del self._positions[item]
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._positions[last[1]] = position
+            if position > 0 and last < self._heap[(position - 1) // 2]: # type: ignore
+                self._sift_up(position)
+            else:
+                self._sift_down(position)
+
+    def _sift_up(self, position: int) -> None:
+        heap = self._heap
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) // 2
+            if not entry < heap[parent]: # type: ignore
+                break
+            heap[position] = heap[parent]
+            self._positions[heap[position][1]] = position
+            position = parent
+        heap[position] = entry
+        self._positions[entry[1]] = position
+
+    def _sift_down(self, position: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]: # type: ignore
+                child += 1
+            if not heap[child] < entry: # type: ignore
+                break
+            heap[position] = heap[child]
+            self._positions[heap[position][1]] = position
+            position = child
+        heap[position] = entry
+        self._positions[entry[1]] = position
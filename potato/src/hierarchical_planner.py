@@ -0,0 +1,84 @@
+import numpy as np
+from nptyping import NDArray, Bool, Float, Shape
+
+from src.constants import D_STAR_FACTOR
+from src.d_star import ArrayDStarLight, State
+from src.playing_area import PlayingArea
+
+class HierarchicalPlanner:
+    """Coarse to fine planner: the route is found on a coarse grid of the whole playing area,
+    then refined on a fine grid restricted to a corridor around this route.
+
+    Positions and paths are in millimeters, so both grids can have any resolution.
+
+    Attributes
+    ----------
+    coarse_resolution, fine_resolution: int
+        Size of the cells of each grid, in mm
+
+    corridor_width: float
+        Distance to the coarse route (in mm) of the fine cells used by the second search
+
+    coarse_planner, fine_planner: ArrayDStarLight | None
+        Planners of the last call to `plan`, `fine_planner` works on the window around the corridor
+    """
+    playing_area: PlayingArea
+    coarse_resolution: int
+    fine_resolution: int
+    corridor_width: float
+    coarse_planner: ArrayDStarLight | None
+    fine_planner: ArrayDStarLight | None
+
+    def __init__(self, playing_area: PlayingArea, coarse_resolution: int = D_STAR_FACTOR, fine_resolution: int = 10, corridor_width: float = 150) -> None:
+        self.playing_area = playing_area
+        self.coarse_resolution = coarse_resolution
+        self.fine_resolution = fine_resolution
+        self.corridor_width = max(corridor_width, coarse_resolution * np.sqrt(2))
+        self.coarse_planner = None
+        self.fine_planner = None
+
+    def to_cell(self, position: tuple[float, float], resolution: int, shape: tuple[int, int]) -> tuple[int, int]:
+        return (
+            min(max(int(position[0] / resolution), 0), shape[0] - 1),
+            min(max(int(position[1] / resolution), 0), shape[1] - 1)
+        )
+
+    def corridor(self, route: NDArray[Shape["*, 2"], Float], shape: tuple[int, int]) -> tuple[slice, slice, NDArray[Shape["*, *"], Bool]]:
+        """Window of the fine grid around `route` (in mm) and the mask of its cells inside the corridor"""
+        margin = self.corridor_width / self.fine_resolution
+        cells = route / self.fine_resolution
+        x_min = max(int(np.floor(cells[:, 0].min() - margin)), 0)
+        x_max = min(int(np.ceil(cells[:, 0].max() + margin)) + 1, shape[0])
+        y_min = max(int(np.floor(cells[:, 1].min() - margin)), 0)
+        y_max = min(int(np.ceil(cells[:, 1].max() + margin)) + 1, shape[1])
+        x = np.arange(x_min, x_max)[:, None, None]
+        y = np.arange(y_min, y_max)[None, :, None]
+        # Distance of each cell of the window to the closest point of the route
+        distance = np.min((x - cells[:, 0]) ** 2 + (y - cells[:, 1]) ** 2, axis=2)
+        return (slice(x_min, x_max), slice(y_min, y_max), distance <= margin ** 2)
+
+    def plan(self, start: tuple[float, float], goal: tuple[float, float]) -> NDArray[Shape["*, 2"], Float]:
+        """Path from `start` to `goal` (in mm) as an (N, 2) array of positions in mm"""
+        coarse_costs = self.playing_area.costs_at_resolution(self.coarse_resolution)
+        self.coarse_planner = ArrayDStarLight(
+            State(*self.to_cell(start, self.coarse_resolution, coarse_costs.shape)),
+            State(*self.to_cell(goal, self.coarse_resolution, coarse_costs.shape)),
+            coarse_costs
+        )
+        self.coarse_planner.compute_shortest_path(False)
+        route = self.coarse_planner.get_path() * self.coarse_resolution
+        route = np.vstack([start, route, goal])
+
+        fine_costs = self.playing_area.costs_at_resolution(self.fine_resolution)
+        start_cell = self.to_cell(start, self.fine_resolution, fine_costs.shape)
+        goal_cell = self.to_cell(goal, self.fine_resolution, fine_costs.shape)
+        (x_window, y_window, inside) = self.corridor(route, fine_costs.shape)
+        window_costs = np.where(inside, fine_costs[x_window, y_window], np.inf)
+        offset = (x_window.start, y_window.start)
+        self.fine_planner = ArrayDStarLight(
+            State(start_cell[0] - offset[0], start_cell[1] - offset[1]),
+            State(goal_cell[0] - offset[0], goal_cell[1] - offset[1]),
+            window_costs
+        )
+        self.fine_planner.compute_shortest_path(False)
+        return (self.fine_planner.get_path() + offset) * self.fine_resolution
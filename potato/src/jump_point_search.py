@@ -0,0 +1,165 @@
+import math
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.d_star import ArrayDStarLight, State
+from src.grid_topology import get_grid_topology
+from src.helpers.indexed_heap import IndexedHeap
+from src.playing_area import BIG_NUMBER, COMPACT_BIG_NUMBER
+
+def is_binary(costs: NDArray[Shape["60,40"], Float]) -> bool:
+    """Whether every cell is either free (cost 1) or blocked (`BIG_NUMBER` or more, `COMPACT_BIG_NUMBER` in a compact cost map)"""
+    return bool(np.all((costs == 1) | (costs >= BIG_NUMBER) | (costs == COMPACT_BIG_NUMBER)))
+
+def octile(dx: int, dy: int) -> float:
+    """Length of the shortest 8-connected path over (dx, dy)"""
+    (dx, dy) = (abs(dx), abs(dy))
+    return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+class JumpPointSearch:
+    """A* on the 8-connected grid of a binary cost map, only expanding jump points (Jump Point Search).
+
+    Straight and diagonal runs of free cells are skipped until a cell where the shortest paths can turn (a jump point),
+    so far fewer cells are expanded than with `DStarLight` on the first plan.
+    Like with `DStarLight`, a diagonal step only needs the cell it goes to to be free.
+    There is no repair after a cost change: use it for a new plan on a binary cost map (see `select_engine`).
+
+    Attributes
+    ----------
+    g: NDArray[(60, 40), Float]
+        Cost from `s_start` to each jump point reached
+
+    parent: NDArray[(2400,), Int]
+        Id of the previous jump point on the path, -1 if the cell has not been reached
+
+    expansions: int
+        Number of jump points expanded
+    """
+    s_start: State
+    s_goal: State
+    costs: NDArray[Shape["60,40"], Float]
+    g: NDArray[Shape["60,40"], Float]
+    u: IndexedHeap[float, int]
+    expansions: int
+    path: NDArray[Shape["*, 2"], Float]
+
+    def __init__(self, s_start: State, s_goal: State, costs: NDArray[Shape["60,40"], Float]) -> None:
+        self.topology = get_grid_topology(*costs.shape)
+        self.s_start = s_start
+        self.s_goal = s_goal
+        self.costs = costs
+        self.free = costs <= 1
+        self._g = np.full(self.topology.size, np.inf)
+        self.g = self._g.reshape(costs.shape)
+        self.parent = np.full(self.topology.size, -1)
+        self.u = IndexedHeap()
+        self.expansions = 0
+        self.path = np.empty((0, 2))
+
+    def is_free(self, x: int, y: int) -> bool:
+        return 0 <= x < self.topology.width and 0 <= y < self.topology.depth and bool(self.free[x, y])
+
+    def heuristic(self, x: int, y: int) -> float:
+        return octile(self.s_goal.value[0] - x, self.s_goal.value[1] - y)
+
+    def jump(self, x: int, y: int, dx: int, dy: int) -> Optional[tuple[int, int]]:
+        """First jump point met when going from (x, y) in the direction (dx, dy), (x, y) included"""
+        while True:
+            if not self.is_free(x, y):
+                return None
+            if x == self.s_goal.value[0] and y == self.s_goal.value[1]:
+                return (x, y)
+            if dx != 0 and dy != 0:
+                if (self.is_free(x - dx, y + dy) and not self.is_free(x - dx, y)) or (self.is_free(x + dx, y - dy) and not self.is_free(x, y - dy)):
+                    return (x, y)
+                if self.jump(x + dx, y, dx, 0) is not None or self.jump(x, y + dy, 0, dy) is not None:
+                    return (x, y)
+            elif dx != 0:
+                if (self.is_free(x + dx, y + 1) and not self.is_free(x, y + 1)) or (self.is_free(x + dx, y - 1) and not self.is_free(x, y - 1)):
+                    return (x, y)
+            elif (self.is_free(x + 1, y + dy) and not self.is_free(x + 1, y)) or (self.is_free(x - 1, y + dy) and not self.is_free(x - 1, y)):
+                return (x, y)
+            x += dx
+            y += dy
+
+    def directions(self, x: int, y: int, parent: Optional[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Directions worth following from (x, y) when coming from `parent`: the natural ones and the forced ones"""
+        if parent is None:
+            return [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+        dx = (x > parent[0]) - (x < parent[0])
+        dy = (y > parent[1]) - (y < parent[1])
+        if dx != 0 and dy != 0:
+            directions = [(0, dy), (dx, 0), (dx, dy)]
+            if not self.is_free(x - dx, y):
+                directions.append((-dx, dy))
+            if not self.is_free(x, y - dy):
+                directions.append((dx, -dy))
+        elif dx != 0:
+            directions = [(dx, 0)] + [(dx, side) for side in (1, -1) if not self.is_free(x, y + side)]
+        else:
+            directions = [(0, dy)] + [(side, dy) for side in (1, -1) if not self.is_free(x + side, y)]
+        return directions
+
+    def compute_shortest_path(self, after_obstacle: bool = False) -> None:
+        """Search from `s_start` to `s_goal`. `after_obstacle` is only there for the interface of the other engines."""
+        start = int(self.topology.to_id(*self.s_start.value))
+        goal = int(self.topology.to_id(*self.s_goal.value))
+        closed = np.zeros(self.topology.size, dtype=bool)
+        self._g[start] = 0
+        self.parent[start] = start
+        self.u.push(start, self.heuristic(*self.s_start.value))
+        while len(self.u) > 0:
+            _, s = self.u.pop()
+            if s == goal:
+                break
+            closed[s] = True
+            self.expansions += 1
+            (x, y) = self.topology.coordinates(s)
+            parent = None if s == start else self.topology.coordinates(int(self.parent[s]))
+            for (dx, dy) in self.directions(x, y, parent):
+                jump_point = self.jump(x + dx, y + dy, dx, dy)
+                if jump_point is None:
+                    continue
+                t = self.topology.to_id(*jump_point)
+                if closed[t]:
+                    continue
+                g = self._g[s] + octile(jump_point[0] - x, jump_point[1] - y)
+                if g < self._g[t]:
+                    self._g[t] = g
+                    self.parent[t] = s
+                    self.u.push(t, g + self.heuristic(*jump_point))
+        self.u.clear()
+
+    def get_path(self) -> NDArray[Shape["*, 2"], Float]:
+        """Every cell of the path from `s_start` to `s_goal`, as an (N, 2) array of grid coordinates like `DStarLight`
+
+        Raises a `ValueError` if the goal has not been reached.
+        """
+        start = int(self.topology.to_id(*self.s_start.value))
+        s = int(self.topology.to_id(*self.s_goal.value))
+        if self.parent[s] < 0:
+            raise ValueError(f"No path from {self.s_start} to {self.s_goal}")
+        jump_points = [self.topology.coordinates(s)]
+        while s != start:
+            s = int(self.parent[s])
+            jump_points.append(self.topology.coordinates(s))
+        jump_points.reverse()
+        # Two consecutive jump points are on the same straight or diagonal line
+        path = [jump_points[0]]
+        for (x, y) in jump_points[1:]:
+            (x_0, y_0) = path[-1]
+            steps = max(abs(x - x_0), abs(y - y_0))
+            dx = (x > x_0) - (x < x_0)
+            dy = (y > y_0) - (y < y_0)
+            path.extend((x_0 + k * dx, y_0 + k * dy) for k in range(1, steps + 1))
+        self.path = np.array(path, dtype=float)
+        return self.path
+
+Engine = type[ArrayDStarLight] | type[JumpPointSearch]
+
+def select_engine(s_start: State, s_goal: State, costs: NDArray[Shape["60,40"], Float]) -> Engine:
+    """Engine for a new plan: `JumpPointSearch` when the cost map is binary and the start and goal are free, `ArrayDStarLight` otherwise"""
+    if is_binary(costs) and costs[s_start.value] <= 1 and costs[s_goal.value] <= 1:
+        return JumpPointSearch
+    return ArrayDStarLight
@@ -3,6 +3,7 @@ import math
 from typing import Optional
 
 from src.constants import *
+from src.cost_atlas import cost_atlas
 from src.playing_area import playing_area
 from src.location.location import Location
 
@@ -48,7 +49,7 @@ class BestAvailable(Location):
     def getLocation(self, current_x: float, current_y: float, current_theta: float) -> Optional[tuple[float, float, float]]:
         match self.location:
             case ImportantLocation.POT:
-                closest_pot = playing_area.get_closest_pot(current_x, current_y, current_theta)
+                closest_pot = playing_area.get_closest_pot(current_x, current_y, current_theta, cost_atlas.travel_cost)
                 if closest_pot is None:
                     return None
                 vector = (closest_pot.zone.x_center - current_x, closest_pot.zone.y_center - current_y)
@@ -69,7 +70,7 @@ class BestAvailable(Location):
                 return (new_vector[0], new_vector[1], required_theta) 
             
             case ImportantLocation.PLANT:
-                closest_plant = playing_area.get_closest_plant(current_x, current_y, current_theta)
+                closest_plant = playing_area.get_closest_plant(current_x, current_y, current_theta, cost_atlas.travel_cost)
                 if closest_plant is None:
                     return None
                 vector = (closest_plant.zone.x_center - current_x, closest_plant.zone.y_center - current_y)
@@ -81,7 +82,7 @@ class BestAvailable(Location):
                 return (current_x + new_vector[0], current_y + new_vector[1], 0)
             
             case ImportantLocation.PLANTER:
-                closest_planter = playing_area.get_best_planter(current_x, current_y, current_theta)
+                closest_planter = playing_area.get_best_planter(current_x, current_y, current_theta, cost_atlas.travel_cost)
                 if closest_planter is None:
                     return None
                 vector = (closest_planter.coordinates.x - current_x, closest_planter.coordinates.y - current_y)
@@ -96,7 +97,7 @@ class BestAvailable(Location):
             case ImportantLocation.SOLAR_PANNEL_END:
                 return playing_area.get_solar_pannel_end()
             case ImportantLocation.END_AREA:
-                closest_end_area = playing_area.get_best_start_area(current_x, current_y, current_theta)
+                closest_end_area = playing_area.get_best_start_area(current_x, current_y, current_theta, cost_atlas.travel_cost)
                 if closest_end_area is None:
                     return None
                 center = closest_end_area.zone.center()
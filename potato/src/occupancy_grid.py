@@ -0,0 +1,104 @@
+import math
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Bool, Float, Shape
+
+from src.constants import D_STAR_FACTOR, PLAYING_AREA_DEPTH, PLAYING_AREA_WIDTH, ROBOT_DEPTH, ROBOT_WIDTH
+
+LOG_ODDS_HIT = 0.9 # Added to a cell where a ray ends
+LOG_ODDS_FREE = -0.4 # Added to a cell crossed by a ray
+LOG_ODDS_LIMIT = 4.0 # Bound of the log odds, so that a cell can change its state in a few scans
+OCCUPIED_LOG_ODDS = 1.5 # Log odds over which a cell is occupied (two hits in a row)
+DECAY_TIME = 2.0 # Time (in s) for the log odds to be divided by e without new scans
+RAY_HALF_WIDTH = 0.5 # Distance (in cells) from a ray under which the center of a cell is crossed by it
+# Points closer to the lidar are on the robot itself
+MIN_RANGE = max(ROBOT_DEPTH, ROBOT_WIDTH) / 2
+
+def free_cells(centers: tuple[NDArray[Shape["60,1"], Float], NDArray[Shape["1,40"], Float]], origin: tuple[float, float], ends: NDArray[Shape["*, 2"], Float]) -> NDArray[Shape["60,40"], Bool]:
+    """Cells crossed by the rays from `origin` to each of `ends` (in cells), before the cell of the end.
+
+    Instead of walking along each ray, each cell looks for the ray closest to it in angle:
+    it is crossed when its center is within `RAY_HALF_WIDTH` of that ray and closer to the origin than the end.
+    The work depends on the size of the grid and not on the length of the rays.
+    """
+    ray_angles = np.arctan2(ends[:, 1] - origin[1], ends[:, 0] - origin[0])
+    ray_ranges = np.hypot(ends[:, 0] - origin[0], ends[:, 1] - origin[1])
+    order = np.argsort(ray_angles)
+    (ray_angles, ray_ranges) = (ray_angles[order], ray_ranges[order])
+
+    (dx, dy) = (centers[0] - origin[0], centers[1] - origin[1])
+    angles = np.arctan2(dy, dx)
+    distances = np.hypot(dx, dy)
+    # The two rays around the angle of each cell, the first and last rays being neighbours
+    after = np.searchsorted(ray_angles, angles) % len(ray_angles)
+    before = (after - 1) % len(ray_angles)
+    gap_after = np.abs(np.angle(np.exp(1j * (ray_angles[after] - angles))))
+    gap_before = np.abs(np.angle(np.exp(1j * (ray_angles[before] - angles))))
+    closest = np.where(gap_after < gap_before, after, before)
+    gap = np.minimum(gap_after, gap_before)
+    return (distances * np.sin(np.minimum(gap, np.pi / 2)) <= RAY_HALF_WIDTH) & (distances < ray_ranges[closest] - RAY_HALF_WIDTH)
+
+class OccupancyGrid:
+    """Log-odds occupancy grid of the lidar, with the cells of the planner grid.
+
+    Each scan adds `LOG_ODDS_HIT` to the cells where the rays end and `LOG_ODDS_FREE` to the cells they cross,
+    each cell counting once per scan. Without scans the log odds decay to 0 (unknown) in about `DECAY_TIME`,
+    so that an obstacle which left is forgotten even if no ray goes through its cells.
+
+    Attributes
+    ----------
+    log_odds: NDArray[(60, 40), Float]
+        Log odds of each cell being occupied, 0 when unknown
+
+    last_update: Optional[float]
+        Time of the last scan integrated, None before the first one
+
+    centers: tuple[NDArray[(60, 1), Float], NDArray[(1, 40), Float]]
+        Coordinates (in cells) of the centers of the cells, to broadcast against each other
+    """
+    resolution: int
+    log_odds: NDArray[Shape["60,40"], Float]
+    last_update: Optional[float]
+    centers: tuple[NDArray[Shape["60,1"], Float], NDArray[Shape["1,40"], Float]]
+
+    def __init__(self, resolution: int = D_STAR_FACTOR) -> None:
+        self.resolution = resolution
+        self.log_odds = np.zeros((int(PLAYING_AREA_WIDTH / resolution), int(PLAYING_AREA_DEPTH / resolution)))
+        self.last_update = None
+        (width, depth) = self.log_odds.shape
+        self.centers = (np.arange(width)[:, None] + 0.5, np.arange(depth)[None, :] + 0.5)
+
+    def decay(self, timestamp: float) -> None:
+        if self.last_update is not None and timestamp > self.last_update:
+            self.log_odds *= math.exp(-(timestamp - self.last_update) / DECAY_TIME)
+        self.last_update = timestamp
+
+    def to_mask(self, points: NDArray[Shape["*, 2"], Float]) -> NDArray[Shape["60,40"], Bool]:
+        """Cells of the grid with at least one of the points (in cells), the points out of the grid are ignored"""
+        cells = np.floor(points).astype(int)
+        (width, depth) = self.log_odds.shape
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < width) & (cells[:, 1] >= 0) & (cells[:, 1] < depth)
+        mask = np.full(self.log_odds.shape, False)
+        mask[cells[inside, 0], cells[inside, 1]] = True
+        return mask
+
+    def integrate(self, robot_x: float, robot_y: float, points: NDArray[Shape["*, 3"], Float], timestamp: float) -> None:
+        """Add a scan, with the robot at (robot_x, robot_y) and the detections (x, y, intensity) in mm"""
+        self.decay(timestamp)
+        if len(points) == 0:
+            return
+        points = points[np.hypot(points[:, 0] - robot_x, points[:, 1] - robot_y) >= MIN_RANGE]
+        if len(points) == 0:
+            return
+        origin = (robot_x / self.resolution, robot_y / self.resolution)
+        ends = points[:, :2] / self.resolution
+        hits = self.to_mask(ends)
+        free = free_cells(self.centers, origin, ends) & ~hits
+        self.log_odds[free] += LOG_ODDS_FREE
+        self.log_odds[hits] += LOG_ODDS_HIT
+        np.clip(self.log_odds, -LOG_ODDS_LIMIT, LOG_ODDS_LIMIT, out=self.log_odds)
+
+    def occupied(self) -> NDArray[Shape["60,40"], Bool]:
+        return self.log_odds > OCCUPIED_LOG_ODDS
+
+occupancy_grid = OccupancyGrid() # Singleton
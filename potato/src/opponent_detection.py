@@ -0,0 +1,100 @@
+import math
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Bool, Float, Int, Shape
+from scipy.ndimage import label
+
+from src.constants import PLAYING_AREA_DEPTH, PLAYING_AREA_WIDTH, ROBOT_DEPTH, ROBOT_WIDTH
+from src.opponent_tracker import OpponentTracker, opponent_tracker
+from src.playing_area import PlayingArea, playing_area
+
+BUCKET_SIZE = 100 # Side (in mm) of the buckets of the clustering, points in touching buckets are in the same cluster
+MIN_CLUSTER_POINTS = 3 # Clusters with less points are noise
+MIN_OPPONENT_EXTENT = 80 # Clusters with a smaller bounding box diagonal (in mm) are table elements (plants, pots)
+MAX_OPPONENT_EXTENT = 500 # Clusters with a larger bounding box diagonal (in mm) are not a robot
+BORDER_MARGIN = 100 # Clusters whose centroid is closer (in mm) to a border are the border or the planters on it
+OWN_ROBOT_MARGIN = 50 # Distance (in mm) around our robot where the points are our mast or our robot itself
+
+class OpponentDetector:
+    """Finds the opponent robot in the lidar points with a grid-bucket clustering.
+
+    The points are put in buckets of `BUCKET_SIZE`, the touching buckets are labelled as one cluster,
+    and the clusters the size of a robot out of the borders, the table elements and our robot are candidates.
+    The candidate closest to the position predicted by the tracker is kept.
+
+    Attributes
+    ----------
+    playing_area: PlayingArea
+        Playing area whose plant and pot areas are table elements
+
+    tracker: OpponentTracker
+        Tracker given the detections, which updates the opponent in the playing area
+    """
+    playing_area: PlayingArea
+    tracker: OpponentTracker
+
+    def __init__(self, playing_area: PlayingArea, tracker: OpponentTracker) -> None:
+        self.playing_area = playing_area
+        self.tracker = tracker
+
+    def clusters(self, points: NDArray[Shape["*, 2"], Float]) -> tuple[NDArray[Shape["*"], Int], int]:
+        """Cluster of each point (from 1), and the number of clusters"""
+        buckets = np.floor(points / BUCKET_SIZE).astype(int)
+        np.clip(buckets[:, 0], 0, math.ceil(PLAYING_AREA_WIDTH / BUCKET_SIZE) - 1, out=buckets[:, 0])
+        np.clip(buckets[:, 1], 0, math.ceil(PLAYING_AREA_DEPTH / BUCKET_SIZE) - 1, out=buckets[:, 1])
+        occupied = np.full((math.ceil(PLAYING_AREA_WIDTH / BUCKET_SIZE), math.ceil(PLAYING_AREA_DEPTH / BUCKET_SIZE)), False)
+        occupied[buckets[:, 0], buckets[:, 1]] = True
+        (labels, count) = label(occupied, structure=np.ones((3, 3)))
+        return (labels[buckets[:, 0], buckets[:, 1]], count)
+
+    def table_elements(self, x: NDArray[Shape["*"], Float], y: NDArray[Shape["*"], Float]) -> NDArray[Shape["*"], Bool]:
+        """Whether each position (in mm) is in a plant area with plants or a pot area with pots"""
+        zones = [area.zone for area in self.playing_area.plant_areas if area.has_plants] + [area.zone for area in self.playing_area.pot_areas if area.has_pots]
+        if len(zones) == 0:
+            return np.full(len(x), False)
+        circles = np.array([zone.geometry() for zone in zones])
+        return (np.hypot(x[:, None] - circles[:, 0], y[:, None] - circles[:, 1]) <= circles[:, 2]).any(axis=1)
+
+    def detect(self, robot_x: float, robot_y: float, points: NDArray[Shape["*, 3"], Float], expected: Optional[tuple[float, float]] = None) -> Optional[tuple[float, float]]:
+        """Center of the opponent (in mm) from the lidar points (x, y, intensity) on the field, None if it is not seen.
+        Among several candidates, the closest to `expected` is kept, or the one with the most points.
+        """
+        points = points[np.hypot(points[:, 0] - robot_x, points[:, 1] - robot_y) > max(ROBOT_DEPTH, ROBOT_WIDTH) / 2 + OWN_ROBOT_MARGIN, :2] if len(points) > 0 else points
+        if len(points) == 0:
+            return None
+        (labels, count) = self.clusters(points)
+        sizes = np.bincount(labels, minlength=count + 1)[1:]
+        centroid_x = np.bincount(labels, weights=points[:, 0], minlength=count + 1)[1:] / sizes
+        centroid_y = np.bincount(labels, weights=points[:, 1], minlength=count + 1)[1:] / sizes
+        # Bounding box of each cluster, with the points sorted by cluster (each cluster has at least one point)
+        order = np.argsort(labels)
+        sorted_points = points[order]
+        starts = np.searchsorted(labels[order], np.arange(1, count + 1))
+        size = np.maximum.reduceat(sorted_points, starts, axis=0) - np.minimum.reduceat(sorted_points, starts, axis=0)
+        extent = np.hypot(size[:, 0], size[:, 1])
+
+        candidates = (sizes >= MIN_CLUSTER_POINTS) & (extent >= MIN_OPPONENT_EXTENT) & (extent <= MAX_OPPONENT_EXTENT)
+        candidates &= (centroid_x >= BORDER_MARGIN) & (centroid_x <= PLAYING_AREA_WIDTH - BORDER_MARGIN)
+        candidates &= (centroid_y >= BORDER_MARGIN) & (centroid_y <= PLAYING_AREA_DEPTH - BORDER_MARGIN)
+        candidates &= ~self.table_elements(centroid_x, centroid_y)
+        if not candidates.any():
+            return None
+
+        (centroid_x, centroid_y, sizes) = (centroid_x[candidates], centroid_y[candidates], sizes[candidates])
+        if expected is not None:
+            best = np.argmin(np.hypot(centroid_x - expected[0], centroid_y - expected[1]))
+        else:
+            best = np.argmax(sizes)
+        # The lidar only sees the near side of the opponent: the centroid of a half circle is 2r / pi from its center
+        distance = math.hypot(centroid_x[best] - robot_x, centroid_y[best] - robot_y)
+        (_, _, radius) = self.playing_area.other_robot.zone.geometry()
+        offset = 2 * radius / math.pi / distance
+        return (float(centroid_x[best] + (centroid_x[best] - robot_x) * offset), float(centroid_y[best] + (centroid_y[best] - robot_y) * offset))
+
+    def update(self, robot_x: float, robot_y: float, points: NDArray[Shape["*, 3"], Float], timestamp: float) -> Optional[tuple[float, float]]:
+        """Detect the opponent in a scan read at `timestamp` and give the detection to the tracker"""
+        position = self.detect(robot_x, robot_y, points, self.tracker.predict(timestamp))
+        self.tracker.update(position, timestamp)
+        return position
+
+opponent_detector = OpponentDetector(playing_area, opponent_tracker) # Singleton
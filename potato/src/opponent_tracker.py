@@ -0,0 +1,104 @@
+import math
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Bool, Shape
+
+from src.constants import D_STAR_FACTOR, OPPONENT_PREDICTION_HORIZON, PLAYING_AREA_DEPTH, PLAYING_AREA_WIDTH
+from src.playing_area import PlayingArea, playing_area
+
+TRACKER_ALPHA = 0.5 # Share of the position error corrected at each detection
+TRACKER_BETA = 0.2 # Share of the position error, over the time since the last detection, added to the velocity
+MAX_OPPONENT_SPEED = 1500 # Speed (in mm/s) over which a velocity estimate is a wrong detection
+MIN_CORRIDOR_SPEED = 100 # Speed (in mm/s) under which the opponent is considered still, without corridor
+LOST_TIMEOUT = 1.0 # Time (in s) without detection after which the velocity is forgotten
+MIN_OPPONENT_MOVE = 25 # Moves of the opponent (in mm) under which the cost map is not updated
+
+def corridor_mask(start: tuple[float, float], end: tuple[float, float], radius: float, resolution: int = D_STAR_FACTOR) -> NDArray[Shape["60,40"], Bool]:
+    """Cells whose center is within `radius` of the segment from `start` to `end` (in mm), the zone swept by a circle along it"""
+    X, Y = np.ogrid[0:int(PLAYING_AREA_WIDTH / resolution), 0:int(PLAYING_AREA_DEPTH / resolution)]
+    (x, y) = ((X + 0.5) * resolution - start[0], (Y + 0.5) * resolution - start[1])
+    (dx, dy) = (end[0] - start[0], end[1] - start[1])
+    length2 = dx**2 + dy**2
+    t = np.clip((x * dx + y * dy) / length2, 0, 1) if length2 > 0 else 0
+    return (x - t * dx)**2 + (y - t * dy)**2 <= radius**2
+
+class OpponentTracker:
+    """Alpha-beta filter of the detections of the opponent, with a constant velocity model.
+
+    The filtered position moves `PlayingArea.other_robot`, and the corridor swept by the opponent until `horizon`
+    goes to its own cost layer, so that the planner avoids where the opponent is going and not only where it was.
+
+    Attributes
+    ----------
+    playing_area: PlayingArea
+        Playing area whose opponent and corridor are updated
+
+    horizon: float
+        Time (in s) ahead covered by the corridor
+
+    position: Optional[tuple[float, float]]
+        Filtered position of the opponent (in mm) at `last_update`, None before the first detection
+
+    velocity: tuple[float, float]
+        Estimated velocity of the opponent (in mm/s)
+
+    last_update: Optional[float]
+        Time of the last detection
+    """
+    playing_area: PlayingArea
+    horizon: float
+    position: Optional[tuple[float, float]]
+    velocity: tuple[float, float]
+    last_update: Optional[float]
+    published: Optional[tuple[float, float]]
+
+    def __init__(self, playing_area: PlayingArea, horizon: float = OPPONENT_PREDICTION_HORIZON) -> None:
+        self.playing_area = playing_area
+        self.horizon = horizon
+        self.position = None
+        self.velocity = (0.0, 0.0)
+        self.last_update = None
+        self.published = None
+
+    def predict(self, timestamp: float) -> Optional[tuple[float, float]]:
+        """Expected position of the opponent at `timestamp`, None if it was never seen"""
+        if self.position is None or self.last_update is None:
+            return None
+        dt = max(timestamp - self.last_update, 0)
+        return (self.position[0] + self.velocity[0] * dt, self.position[1] + self.velocity[1] * dt)
+
+    def update(self, detection: Optional[tuple[float, float]], timestamp: float) -> None:
+        """Add the detection (in mm) of a scan, None if the opponent was not seen"""
+        lost = self.last_update is None or timestamp - self.last_update > LOST_TIMEOUT
+        if detection is None:
+            if lost and self.velocity != (0.0, 0.0):
+                self.velocity = (0.0, 0.0)
+                self.playing_area.set_opponent_corridor(None)
+            return
+
+        predicted = self.predict(timestamp)
+        if predicted is None or lost:
+            (self.position, self.velocity) = (detection, (0.0, 0.0))
+        elif timestamp > self.last_update:
+            dt = timestamp - self.last_update
+            residual = (detection[0] - predicted[0], detection[1] - predicted[1])
+            self.position = (predicted[0] + TRACKER_ALPHA * residual[0], predicted[1] + TRACKER_ALPHA * residual[1])
+            velocity = (self.velocity[0] + TRACKER_BETA * residual[0] / dt, self.velocity[1] + TRACKER_BETA * residual[1] / dt)
+            speed = math.hypot(*velocity)
+            self.velocity = velocity if speed <= MAX_OPPONENT_SPEED else (velocity[0] * MAX_OPPONENT_SPEED / speed, velocity[1] * MAX_OPPONENT_SPEED / speed)
+        self.last_update = timestamp
+
+        if self.published is None or math.hypot(self.position[0] - self.published[0], self.position[1] - self.published[1]) >= MIN_OPPONENT_MOVE:
+            self.published = self.position
+            self.playing_area.set_other_robot_position(*self.position)
+        self.playing_area.set_opponent_corridor(self.corridor())
+
+    def corridor(self) -> Optional[NDArray[Shape["60,40"], Bool]]:
+        """Cells the center of our robot must avoid for the opponent to pass until `horizon`, None if it is still"""
+        if self.position is None or math.hypot(*self.velocity) < MIN_CORRIDOR_SPEED:
+            return None
+        end = (self.position[0] + self.velocity[0] * self.horizon, self.position[1] + self.velocity[1] * self.horizon)
+        (_, _, radius) = self.playing_area.other_robot.zone.zone_with_robot_size().geometry()
+        return corridor_mask(self.position, end, radius)
+
+opponent_tracker = OpponentTracker(playing_area) # Singleton
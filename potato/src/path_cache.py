@@ -0,0 +1,89 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.d_star import State
+from src.jump_point_search import select_engine
+
+PathKey = tuple[tuple[int, int], tuple[int, int], str]
+
+def costs_fingerprint(costs: NDArray[Shape["60,40"], Float]) -> str:
+    """Short digest of a cost map, stable between runs so that it can be saved"""
+    return hashlib.blake2b(np.ascontiguousarray(costs).tobytes(), digest_size=8).hexdigest()
+
+class PathCache:
+    """Paths of the planner, keyed by start cell, goal cell and fingerprint of the cost map.
+
+    The least recently used path is dropped when the cache is full.
+    The same move with the same cost map (same plants, pots and other robot position) is not planned again.
+    The other moves are planned from scratch with the engine given by `select_engine`.
+
+    Attributes
+    ----------
+    size: int
+        Maximum number of paths kept
+
+    paths: OrderedDict[PathKey, NDArray[(*, 2), Float]]
+        Cached paths, from the least to the most recently used
+
+    hits: int
+        Number of paths found in the cache
+
+    misses: int
+        Number of paths which had to be planned
+    """
+    size: int
+    paths: OrderedDict[PathKey, NDArray[Shape["*, 2"], Float]]
+    hits: int
+    misses: int
+
+    def __init__(self, size: int = 64) -> None:
+        self.size = size
+        self.paths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_path(self, start: State, goal: State, costs: NDArray[Shape["60,40"], Float]) -> NDArray[Shape["*, 2"], Float]:
+        """Path of cells from `start` to `goal` on `costs`, planned only if it is not in the cache"""
+        key = (start.value, goal.value, costs_fingerprint(costs))
+        path = self.paths.get(key)
+        if path is not None:
+            self.hits += 1
+            self.paths.move_to_end(key)
+            return path.copy()
+
+        self.misses += 1
+        planner = select_engine(start, goal, costs)(start, goal, costs.copy())
+        planner.compute_shortest_path(False)
+        path = planner.get_path()
+        self.paths[key] = path
+        if len(self.paths) > self.size:
+            self.paths.popitem(last=False)
+        return path.copy()
+
+    def save(self, file_name: str) -> None:
+        """Save the cached paths, to be loaded at the next match"""
+        entries = [
+            {"start": list(start), "goal": list(goal), "costs": fingerprint, "path": path.tolist()}
+            for ((start, goal, fingerprint), path) in self.paths.items()
+        ]
+        os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+        with open(file_name, "w") as file:
+            json.dump(entries, file)
+
+    def load(self, file_name: str) -> None:
+        """Add the paths saved by `save`, nothing is done if the file does not exist"""
+        if not os.path.exists(file_name):
+            return
+        with open(file_name) as file:
+            entries = json.load(file)
+        for entry in entries:
+            key = (tuple(entry["start"]), tuple(entry["goal"]), entry["costs"])
+            self.paths[key] = np.array(entry["path"], dtype=float).reshape(-1, 2)
+        while len(self.paths) > self.size:
+            self.paths.popitem(last=False)
+
+path_cache = PathCache() # Singleton
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from typing import Optional
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.constants import D_STAR_FACTOR
+from src.d_star import State
+from src.logging import logging_debug
+from src.path_cache import PathCache, path_cache
+from src.playing_area import PlayingArea, playing_area
+
+class PlanRequest:
+    """Path requested to the planner worker
+
+    Attributes
+    ----------
+    start: State
+        Start of the path, updated with the last position of the robot while the request is waiting
+
+    goal: State
+        Goal of the path
+
+    future: asyncio.Future
+        Future given to the caller, resolved in its event loop
+    """
+    start: State
+    goal: State
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+
+    def __init__(self, start: State, goal: State, loop: asyncio.AbstractEventLoop) -> None:
+        self.start = start
+        self.goal = goal
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def resolve(self, path: Optional[NDArray[Shape["*, 2"], Float]], exception: Optional[Exception] = None) -> None:
+        """Give the result to the caller, from any thread"""
+        def set_result() -> None:
+            if self.future.done():
+                return
+            if exception is not None:
+                self.future.set_exception(exception)
+            else:
+                self.future.set_result(path)
+        self.loop.call_soon_threadsafe(set_result)
+
+    def cancel(self) -> None:
+        self.loop.call_soon_threadsafe(self.future.cancel)
+
+class PlannerWorker:
+    """Planner running in its own thread, so that planning never blocks the event loop of the actions.
+
+    Moves along a clear straight segment do not go through the thread at all.
+    Only one request is kept: a new `plan` supersedes the previous one, whose caller gets `asyncio.CancelledError`.
+    The position updates given to `set_start` replace the start of the waiting request,
+    and the running request is planned again if the robot moved to another cell meanwhile.
+
+    Attributes
+    ----------
+    playing_area: PlayingArea
+        Playing area whose cost map is used for each request
+
+    cache: PathCache
+        Cache in front of the planner
+    """
+    playing_area: PlayingArea
+    cache: PathCache
+    condition: threading.Condition
+    pending: Optional[PlanRequest]
+    running: Optional[PlanRequest]
+    thread: Optional[threading.Thread]
+    stopped: bool
+
+    def __init__(self, playing_area: PlayingArea, cache: PathCache) -> None:
+        self.playing_area = playing_area
+        self.cache = cache
+        self.condition = threading.Condition()
+        self.pending = None
+        self.running = None
+        self.thread = None
+        self.stopped = False
+
+    def start(self) -> None:
+        with self.condition:
+            if self.thread is not None:
+                return
+            self.stopped = False
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopped = True
+            if self.pending is not None:
+                self.pending.cancel()
+                self.pending = None
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    async def plan(self, start: State, goal: State) -> NDArray[Shape["*, 2"], Float]:
+        """Path of cells from `start` to `goal`, computed in the worker thread.
+
+        When the straight segment is clear, it is the path and the planner is not called.
+        """
+        straight = self.playing_area.is_segment_clear(
+            (start.value[0] * D_STAR_FACTOR, start.value[1] * D_STAR_FACTOR), (goal.value[0] * D_STAR_FACTOR, goal.value[1] * D_STAR_FACTOR)
+        )
+        request = None if straight else PlanRequest(start, goal, asyncio.get_running_loop())
+        with self.condition:
+            for superseded in (self.pending, self.running):
+                if superseded is not None:
+                    superseded.cancel()
+            self.pending = request
+            self.condition.notify()
+        if request is None:
+            return np.array([start.value, goal.value], dtype=float)
+        self.start()
+        return await request.future
+
+    def set_start(self, x: float, y: float) -> None:
+        """New position of the robot (in mm), the requests not finished yet will start from there"""
+        start = State(int(x / D_STAR_FACTOR), int(y / D_STAR_FACTOR))
+        with self.condition:
+            for request in (self.pending, self.running):
+                if request is not None:
+                    request.start = start
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                request = self.pending
+                self.pending = None
+                if request.future.cancelled():
+                    continue
+                self.running = request
+                start = request.start
+
+            path: Optional[NDArray[Shape["*, 2"], Float]] = None
+            exception: Optional[Exception] = None
+            try:
+                path = self.cache.get_path(start, request.goal, self.playing_area.cost)
+            except Exception as ex:
+                exception = ex
+
+            with self.condition:
+                self.running = None
+                if request.start != start and self.pending is None:
+                    logging_debug("The robot moved while planning, plan again")
+                    self.pending = request
+                    continue
+            request.resolve(path, exception)
+
+planner_worker = PlannerWorker(playing_area, path_cache) # Singleton
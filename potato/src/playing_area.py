@@ -1,15 +1,48 @@
-from typing import Optional
+from typing import Callable, Hashable, Optional, TypeVar
 import numpy as np
 import math
-from nptyping import NDArray, Float, Shape
+from nptyping import NDArray, Bool, Float, Shape, UInt8
+from scipy.ndimage import binary_dilation, distance_transform_edt
+import threading
 
-from src.constants import ROBOT_DEPTH, Side, PLAYING_AREA_WIDTH, PLAYING_AREA_DEPTH, D_STAR_FACTOR
+from src.constants import CLEARANCE_DISTANCE, CLEARANCE_PENALTY, COMPACT_DTYPE, OPPONENT_CORRIDOR_COST, ROBOT_DEPTH, ROBOT_WIDTH, Side, PLAYING_AREA_WIDTH, PLAYING_AREA_DEPTH, D_STAR_FACTOR
+from src.cost_layers import LayeredCostMap, grow, mask_layer, relative
 from src.game_elements import PlantArea, Planter, PotArea, StartArea, OtherRobot
 from src.location.location import AbsoluteCoordinates
 from src.logging import logging_warning
+from src.straight_line import segment_is_clear
 from src.zone import Circle, Rectangle, Zone
 
 BIG_NUMBER = 10**10
+# Cost of a blocked cell in a compact cost map. Costs of 10**10 would hide the distances (the step of float32 around it is 1024),
+# this one is still far over the cost of any path on the table and keeps a step under 0.01 for the costs of a crossing.
+COMPACT_BIG_NUMBER = 4096
+
+def footprint(radius: float) -> NDArray[Shape["*, *"], Bool]:
+    """Cells within `radius` cells of the center one, rasterized like a `Circle`"""
+    reach = math.floor(radius)
+    X, Y = np.ogrid[-reach:reach + 1, -reach:reach + 1]
+    return np.ceil(np.sqrt(X**2 + Y**2)) <= radius
+
+# Cells around an obstacle seen by the lidar that the center of the robot cannot enter
+ROBOT_FOOTPRINT = footprint(max(ROBOT_DEPTH, ROBOT_WIDTH) / 2 / D_STAR_FACTOR)
+
+Element = TypeVar("Element", PlantArea, PotArea, Planter, StartArea)
+# Cost to go from (x, y) in mm to the element, None if it is not known
+TravelCost = Callable[[Element, float, float], Optional[float]]
+
+def clearance_costs(blocked: NDArray[Shape["60,40"], Bool], resolution: int) -> NDArray[Shape["60,40"], Float]:
+    """Cost map from the blocked cells of a grid with cells of `resolution` mm.
+
+    The blocked cells cost `BIG_NUMBER`. Around them the penalty decreases linearly with the distance to the closest blocked cell,
+    from `CLEARANCE_PENALTY` to 0 at `CLEARANCE_DISTANCE`, so that paths keep some margin when they can.
+    """
+    if not blocked.any():
+        return np.ones(blocked.shape)
+    distance = distance_transform_edt(~blocked) * resolution
+    costs = 1 + CLEARANCE_PENALTY * np.clip(1 - distance / CLEARANCE_DISTANCE, 0, 1)
+    costs[blocked] = BIG_NUMBER
+    return costs
 
 class PlayingArea:
     """Class represenging the playing area.
@@ -23,11 +56,19 @@ class PlayingArea:
     other_robot: OtherRobot
     obstacles_change: list[Zone]
     cost: NDArray[Shape["60,40"], Float]
+    cost_map: LayeredCostMap
+    costs_lock: threading.RLock
+    lidar_occupied: NDArray[Shape["60,40"], Bool]
+    opponent_corridor: Optional[NDArray[Shape["60,40"], Bool]]
     side: Side
 
 
     def __init__(self) -> None:
         self.cost = np.full((int(PLAYING_AREA_WIDTH / D_STAR_FACTOR), int(PLAYING_AREA_DEPTH /D_STAR_FACTOR)), 1.0)
+        self.cost_map = LayeredCostMap(self.cost.shape, D_STAR_FACTOR, BIG_NUMBER)
+        self.costs_lock = threading.RLock()
+        self.lidar_occupied = np.full(self.cost.shape, False)
+        self.opponent_corridor = None
         self.obstacles_change = []
         self.start_areas = [
             StartArea(is_reserved=False, zone=Rectangle(0, 0, 450, 450), side=Side.BLUE),
@@ -73,63 +114,136 @@ class PlayingArea:
             self.start_areas[index].is_start_used_for_game = True
 
     def compute_costs(self):
-        self.cost = np.full((int(PLAYING_AREA_WIDTH / D_STAR_FACTOR), int(PLAYING_AREA_DEPTH /D_STAR_FACTOR)), 1.0)
-        for start_area in self.start_areas:
-            if start_area.is_reserved and start_area.side != self.side:
-                self.cost[start_area.zone.zone_with_robot_size().points_in_zone()] = BIG_NUMBER
-        for plant_area in self.plant_areas:
-            if plant_area.has_plants:
-                self.cost[plant_area.zone.zone_with_robot_size().points_in_zone()] = BIG_NUMBER
-        for pot_area in self.pot_areas:
-            if pot_area.has_pots:
-                self.cost[pot_area.zone.zone_with_robot_size().points_in_zone()] = BIG_NUMBER
-        self.cost[self.other_robot.zone.zone_with_robot_size().points_in_zone()] = BIG_NUMBER
+        """Update `cost` with the obstacles which appeared, disappeared or moved since the last call.
+        Only the clearance costs around the changes are computed again.
+        """
+        with self.costs_lock:
+            for (key, zone, blocking) in self.obstacles():
+                self.cost_map.set_zone(key, zone.zone_with_robot_size() if blocking else None)
+            window = self.cost_map.dirty
+            if window is None:
+                return
+            composed = self.cost_map.compose()
+            blocked = composed >= BIG_NUMBER
+            # Cells whose clearance can change, and the cells whose obstacles are close enough to them
+            reach = math.ceil(CLEARANCE_DISTANCE / D_STAR_FACTOR)
+            changed = grow(window, reach, blocked.shape)
+            around = grow(changed, reach, blocked.shape)
+            cost = self.cost.copy()
+            # The layers which do not block (the predicted corridor of the opponent) keep their cost over the clearance
+            cost[changed] = np.maximum(clearance_costs(blocked[around], D_STAR_FACTOR)[relative(changed, around)], composed[changed])
+            self.cost = cost
 
-    def set_other_robot_position(self, x: float, y: float):
-        if x != self.other_robot.zone.x_center or y != self.other_robot.zone.y_center:
-            self.obstacles_change.append(self.other_robot.zone.zone_with_robot_size())
-            self.other_robot.zone.x_center = x
-            self.other_robot.zone.y_center = y
-            self.obstacles_change.append(self.other_robot.zone.zone_with_robot_size())
+    def set_lidar_obstacles(self, occupied: NDArray[Shape["60,40"], Bool]) -> None:
+        """Cells of the planner grid where the lidar sees an obstacle (see `OccupancyGrid`).
+        They are grown by the robot size like the zones, and kept in their own cost layer until the next call.
+        """
+        with self.costs_lock:
+            if np.array_equal(occupied, self.lidar_occupied):
+                return
+            self.lidar_occupied = occupied.copy()
+            grown = binary_dilation(occupied, structure=ROBOT_FOOTPRINT)
+            self.cost_map.set_layer("lidar", mask_layer(grown, BIG_NUMBER))
+            self.compute_costs()
+
+    def set_opponent_corridor(self, corridor: Optional[NDArray[Shape["60,40"], Bool]]) -> None:
+        """Cells the opponent is expected to sweep soon (see `OpponentTracker`), None if it is not moving.
+        They cost `OPPONENT_CORRIDOR_COST` in their own layer, so that the planner avoids them without being trapped by a wrong prediction.
+        """
+        with self.costs_lock:
+            if corridor is None and self.opponent_corridor is None:
+                return
+            if corridor is not None and self.opponent_corridor is not None and np.array_equal(corridor, self.opponent_corridor):
+                return
+            self.opponent_corridor = None if corridor is None else corridor.copy()
+            self.cost_map.set_layer("opponent_corridor", None if corridor is None else mask_layer(corridor, OPPONENT_CORRIDOR_COST))
             self.compute_costs()
 
-    def get_closest_pot(self, current_x: float, current_y: float, current_theta: float) -> Optional[PotArea]:
-        min_distance = np.inf
-        min_arg: Optional[PotArea] = None
-        for pot_area in self.pot_areas:
-            if pot_area.has_pots:
-                distance = math.sqrt(math.pow(pot_area.zone.x_center - current_x, 2) + math.pow(pot_area.zone.y_center - current_y, 2))
-                if distance < min_distance:
-                    min_distance = distance
-                    min_arg = pot_area
+    def obstacles(self) -> list[tuple[Hashable, Zone, bool]]:
+        """Each obstacle with the key of its cost layer, its zone, and whether it blocks the robot now.
+        The reserved start areas only block the robot of the other side, the plant and pot areas only while they are full.
+        """
+        obstacles: list[tuple[Hashable, Zone, bool]] = []
+        obstacles += [(("start_area", i), start_area.zone, start_area.is_reserved and start_area.side != self.side) for (i, start_area) in enumerate(self.start_areas)]
+        obstacles += [(("plant_area", i), plant_area.zone, plant_area.has_plants) for (i, plant_area) in enumerate(self.plant_areas)]
+        obstacles += [(("pot_area", i), pot_area.zone, pot_area.has_pots) for (i, pot_area) in enumerate(self.pot_areas)]
+        obstacles.append(("other_robot", self.other_robot.zone, True))
+        return obstacles
+
+    def obstacle_zones(self) -> list[Zone]:
+        """Zones the center of the robot cannot enter: the blocking obstacles grown by the robot size"""
+        return [zone.zone_with_robot_size() for (_, zone, blocking) in self.obstacles() if blocking]
+
+    def occupancy_at_resolution(self, resolution: int) -> NDArray[Shape["60,40"], UInt8]:
+        """Cells blocked (1) by the obstacle zones, for a grid with cells of `resolution` mm"""
+        occupancy = np.zeros((int(PLAYING_AREA_WIDTH / resolution), int(PLAYING_AREA_DEPTH / resolution)), dtype=np.uint8)
+        for zone in self.obstacle_zones():
+            (window, mask) = zone.window_mask(resolution)
+            occupancy[window] |= mask
+        return occupancy
+
+    def costs_at_resolution(self, resolution: int, compact: bool = False) -> NDArray[Shape["60,40"], Float]:
+        """Cost map of the playing area for a planner grid with cells of `resolution` mm, with the penalties of `clearance_costs`.
+
+        The compact cost map is in `COMPACT_DTYPE`, with `COMPACT_BIG_NUMBER` for the blocked cells.
+        """
+        blocked = self.occupancy_at_resolution(resolution).astype(bool)
+        costs = clearance_costs(blocked, resolution)
+        if compact:
+            return np.where(blocked, COMPACT_BIG_NUMBER, costs).astype(COMPACT_DTYPE)
+        return costs
+
+    def is_segment_clear(self, a: tuple[float, float], b: tuple[float, float]) -> bool:
+        """Whether the robot can go straight from `a` to `b` (in mm): the segment crosses no obstacle zone and no blocked cell of `cost`"""
+        if any(zone.intersect_with_line(a, b) for zone in self.obstacle_zones()):
+            return False
+        return segment_is_clear(self.cost, (a[0] / D_STAR_FACTOR, a[1] / D_STAR_FACTOR), (b[0] / D_STAR_FACTOR, b[1] / D_STAR_FACTOR))
+
+    def set_other_robot_position(self, x: float, y: float):
+        with self.costs_lock:
+            if x != self.other_robot.zone.x_center or y != self.other_robot.zone.y_center:
+                self.obstacles_change.append(self.other_robot.zone.zone_with_robot_size())
+                self.other_robot.zone.x_center = x
+                self.other_robot.zone.y_center = y
+                self.obstacles_change.append(self.other_robot.zone.zone_with_robot_size())
+                self.compute_costs()
+
+    def closest(self, candidates: list[Element], positions: list[tuple[float, float]], current_x: float, current_y: float, travel_cost: Optional[TravelCost] = None) -> Optional[Element]:
+        """Candidate with the lowest travel cost from the current position.
+
+        Uses the straight-line distance to `positions` when `travel_cost` is not given or does not know every candidate.
+        """
+        if len(candidates) == 0:
+            return None
+        costs: list[Optional[float]] = [None] * len(candidates)
+        if travel_cost is not None:
+            costs = [travel_cost(candidate, current_x, current_y) for candidate in candidates]
+        if any(cost is None for cost in costs):
+            costs = [math.sqrt(math.pow(x - current_x, 2) + math.pow(y - current_y, 2)) for (x, y) in positions]
+        return candidates[int(np.argmin(costs))]
+
+    def get_closest_pot(self, current_x: float, current_y: float, current_theta: float, travel_cost: Optional[TravelCost] = None) -> Optional[PotArea]:
+        candidates = [pot_area for pot_area in self.pot_areas if pot_area.has_pots]
+        min_arg = self.closest(candidates, [(pot_area.zone.x_center, pot_area.zone.y_center) for pot_area in candidates], current_x, current_y, travel_cost)
         if min_arg is None:
             logging_warning("No pot found")
             return None
         return min_arg
 
-    def get_closest_plant(self, current_x: float, current_y: float, current_theta: float) -> Optional[PlantArea]:
-        min_distance = np.inf
-        min_arg: Optional[PlantArea] = None
-        for plant_area in self.plant_areas:
-            if plant_area.has_plants:
-                distance = math.sqrt(math.pow(plant_area.zone.x_center - current_x, 2) + math.pow(plant_area.zone.y_center - current_y, 2))
-                if distance < min_distance:
-                    min_distance = distance
-                    min_arg = plant_area
+    def get_closest_plant(self, current_x: float, current_y: float, current_theta: float, travel_cost: Optional[TravelCost] = None) -> Optional[PlantArea]:
+        candidates = [plant_area for plant_area in self.plant_areas if plant_area.has_plants]
+        min_arg = self.closest(candidates, [(plant_area.zone.x_center, plant_area.zone.y_center) for plant_area in candidates], current_x, current_y, travel_cost)
         if min_arg is None:
             logging_warning("No plant found")
             return None
         return min_arg
 
-    def get_best_planter(self, current_x: float, current_y: float, current_theta: float) -> Optional[Planter]:
-        min_distance = np.inf
-        min_arg: Optional[Planter] = None
-        for planter in self.planters:
-            if not planter.has_pots and (planter.blocked_by is None or not planter.blocked_by.has_pots):
-                distance = math.sqrt(math.pow(planter.coordinates.x - current_x, 2) + math.pow(planter.coordinates.y - current_y, 2))
-                if distance < min_distance:
-                    min_distance = distance
-                    min_arg = planter
+    def get_best_planter(self, current_x: float, current_y: float, current_theta: float, travel_cost: Optional[TravelCost] = None) -> Optional[Planter]:
+        candidates = [
+            planter for planter in self.planters
+            if not planter.has_pots and (planter.blocked_by is None or not planter.blocked_by.has_pots)
+        ]
+        min_arg = self.closest(candidates, [(planter.coordinates.x, planter.coordinates.y) for planter in candidates], current_x, current_y, travel_cost)
         if min_arg is None:
             logging_warning("No planter found")
             return None
@@ -141,15 +255,12 @@ class PlayingArea:
     def get_solar_pannel_end(self) -> tuple[float, float, float]:
         return (10, 10, 10)
 
-    def get_best_start_area(self, current_x: float, current_y: float, current_theta: float) -> Optional[StartArea]:
-        min_distance = np.inf
-        min_arg: Optional[StartArea] = None
-        for start_area in self.start_areas:
-            if start_area.side == playing_area.side and start_area.is_start_used_for_game == False:
-                distance = math.sqrt(math.pow(start_area.zone.center()[0] - current_x, 2) + math.pow(start_area.zone.center()[1] - current_y, 2))
-                if distance < min_distance:
-                    min_distance = distance
-                    min_arg = start_area
+    def get_best_start_area(self, current_x: float, current_y: float, current_theta: float, travel_cost: Optional[TravelCost] = None) -> Optional[StartArea]:
+        candidates = [
+            start_area for start_area in self.start_areas
+            if start_area.side == playing_area.side and start_area.is_start_used_for_game == False
+        ]
+        min_arg = self.closest(candidates, [start_area.zone.center() for start_area in candidates], current_x, current_y, travel_cost)
         if min_arg is None:
             logging_warning("No start_area found")
             return None
@@ -0,0 +1,51 @@
+import numpy as np
+from nptyping import NDArray, Bool, Float, Shape
+
+from src.d_star import ArrayDStarLight, State
+from src.logging import logging_warning
+from src.playing_area import PlayingArea
+
+class Replanner:
+    """Live `ArrayDStarLight` kept up to date with the cost map of the playing area.
+
+    At each `replan`, the cost map of the playing area is compared with the one the planner knows
+    and the changed cells are given to `ArrayDStarLight.repair`.
+    The whole map is compared: the zones of `PlayingArea.obstacles_change` only cover the moves of the other robot,
+    while `compute_costs` (plants, pots, start areas) changes costs without adding to it.
+    The search is repaired instead of being rebuilt, so the work depends on the changed area.
+    If the path cannot be extracted from the repaired search, a new search is done.
+    """
+    playing_area: PlayingArea
+    goal: State
+    costs: NDArray[Shape["60,40"], Float]
+    d_star: ArrayDStarLight
+
+    def __init__(self, playing_area: PlayingArea, start: State, goal: State) -> None:
+        self.playing_area = playing_area
+        self.goal = goal
+        # Cost map known by the planner, updated in place
+        self.costs = playing_area.cost.copy()
+        self.new_search(start)
+
+    def new_search(self, start: State) -> NDArray[Shape["*, 2"], Float]:
+        self.d_star = ArrayDStarLight(start, self.goal, self.costs)
+        self.d_star.compute_shortest_path(False)
+        return self.d_star.get_path()
+
+    def changed_cells(self) -> NDArray[Shape["60,40"], Bool]:
+        """Cells whose cost changed since the last call. The planner's cost map is updated."""
+        new_costs = self.playing_area.cost
+        changed = new_costs != self.costs
+        self.costs[changed] = new_costs[changed]
+        return changed
+
+    def replan(self, start: State) -> NDArray[Shape["*, 2"], Float]:
+        """Path from `start` to the goal with the current cost map"""
+        changed = self.changed_cells()
+        self.d_star.s_start = start
+        self.d_star.repair([State(int(x), int(y)) for (x, y) in np.argwhere(changed)])
+        try:
+            return self.d_star.get_path()
+        except ValueError:
+            logging_warning("Repaired search leads in circles, new search")
+            return self.new_search(start)
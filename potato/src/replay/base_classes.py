@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 
 
 class EventType(int, Enum):
@@ -12,6 +12,7 @@ class EventType(int, Enum):
     PLANT_IN_PLANTER = 5
     SCORE = 6
     LIDAR = 7
+    PLANNER_STATS = 8
 
     def string_name(self) -> str:
         match self:
@@ -30,3 +31,4 @@ class ReplayEvent:
     place: Optional[tuple[float, float, float]] = None
     number: Optional[int] = None
     time: float = 0
+    stats: Optional[dict[str, Any]] = None
@@ -3,12 +3,16 @@ from typing import Any
 
 from src.replay.base_classes import ReplayEvent, EventType
 
-def event_decoder(event_dict: dict[str, Any]) -> ReplayEvent:
+def event_decoder(event_dict: dict[str, Any]) -> ReplayEvent | dict[str, Any]:
+    if "event" not in event_dict:
+        # Dictionary inside an event (`stats`)
+        return event_dict
     return ReplayEvent(
         event=EventType(event_dict["event"]),
-        place=tuple[float, float, float](event_dict["place"]),
+        place=tuple[float, float, float](event_dict["place"]) if event_dict["place"] is not None else None,
         number=event_dict["number"],
-        time=event_dict["time"]
+        time=event_dict["time"],
+        stats=event_dict.get("stats")
     )
 
 def load_replay(file: str) -> list[ReplayEvent]:
@@ -1,12 +1,22 @@
 from enum import Enum
-from typing import Optional
+from typing import Optional, Sized
 import math
+from operator import attrgetter
 from nptyping import NDArray, Float, Shape, Bool
 import numpy as np
+import threading
+import time
 
 from src.constants import PLAYING_AREA_WIDTH, PLAYING_AREA_DEPTH, mock_robot
 from src.logging import logging_error
 
+SCAN_CAPACITY = 1024 # Points of the buffers allocated at start, a scan at 12 Hz has about 420 points
+# Scans kept by the ring, a consumer can hold a scan for RING_SIZE - 1 scan periods (about 0.5 s) before it is overwritten
+RING_SIZE = 8
+SCAN_TIMEOUT = 0.2 # Time (in s) a consumer waits for a new scan, more than two scan periods
+
+POINT_FIELDS = attrgetter("angle", "range", "intensity") # Fields of a `LaserPoint`, read without a Python loop
+
 class LidarDirection(Enum):
     ALL = 0
     FORWARD = 1
@@ -15,9 +25,105 @@ class LidarDirection(Enum):
 if not mock_robot:
     import ydlidar
 
+def reserve(buffer: NDArray, count: int) -> NDArray:
+    """`buffer`, or a new one twice as long if it has less than `count` rows"""
+    if len(buffer) >= count:
+        return buffer
+    return np.empty((max(count, 2 * len(buffer)),) + buffer.shape[1:])
+
+class LidarScan:
+    """Scan of the lidar in a slot of the `ScanRing`
+
+    Attributes
+    ----------
+    points: NDArray[(*, 3), Float]
+        Points (angle, distance, intensity), a view on the slot which is overwritten `RING_SIZE` scans later
+
+    timestamp: float
+        Time (`time.time()`) at which the scan was read
+
+    sequence: int
+        Number of the scan, starting at 1
+    """
+    points: NDArray[Shape["*, 3"], Float]
+    timestamp: float
+    sequence: int
+
+    def __init__(self, points: NDArray[Shape["*, 3"], Float], timestamp: float, sequence: int) -> None:
+        self.points = points
+        self.timestamp = timestamp
+        self.sequence = sequence
+
+class ScanRing:
+    """Fixed ring of preallocated scans, written by the acquisition thread and read without copies by the consumers.
+
+    The producer fills the slot after the latest scan and only then publishes it,
+    so a consumer never sees a scan being written as long as it does not keep it for more than `RING_SIZE - 1` scans.
+
+    Attributes
+    ----------
+    slots: list[NDArray[(*, 3), Float]]
+        Buffer of each scan
+
+    latest_scan: Optional[LidarScan]
+        Last scan published, None before the first one
+    """
+    slots: list[NDArray[Shape["*, 3"], Float]]
+    latest_scan: Optional[LidarScan]
+    condition: threading.Condition
+
+    def __init__(self, size: int = RING_SIZE, capacity: int = SCAN_CAPACITY) -> None:
+        self.slots = [np.empty((capacity, 3)) for _ in range(size)]
+        self.latest_scan = None
+        self.condition = threading.Condition()
+
+    def next_slot(self, count: int) -> NDArray[Shape["*, 3"], Float]:
+        """Buffer of at least `count` points where the producer writes the next scan"""
+        index = 0 if self.latest_scan is None else self.latest_scan.sequence % len(self.slots)
+        self.slots[index] = reserve(self.slots[index], count)
+        return self.slots[index]
+
+    def publish(self, points: NDArray[Shape["*, 3"], Float], timestamp: float) -> None:
+        """Make the scan written in `next_slot` the latest one and wake up the consumers"""
+        with self.condition:
+            sequence = 1 if self.latest_scan is None else self.latest_scan.sequence + 1
+            self.latest_scan = LidarScan(points, timestamp, sequence)
+            self.condition.notify_all()
+
+    def latest(self) -> Optional[LidarScan]:
+        """Last scan published, without waiting"""
+        return self.latest_scan
+
+    def wait_after(self, sequence: int, timeout: float) -> Optional[LidarScan]:
+        """First scan published after the scan `sequence` (0 for any scan), None if none came within `timeout` seconds"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.latest_scan is not None and self.latest_scan.sequence > sequence, timeout)
+            if self.latest_scan is None or self.latest_scan.sequence <= sequence:
+                return None
+            return self.latest_scan
+
 class Lidar:
+    """Lidar of the robot. A dedicated thread reads the scans and converts them to NumPy arrays in buffers allocated once,
+    so that the scan rate does not depend on the time spent by the consumers.
+
+    Attributes
+    ----------
+    ring: ScanRing
+        Last scans read by the acquisition thread
+
+    coordinates_buffer: NDArray[(*, 3), Float]
+        Points (x, y, intensity) of the last call to `get_lidar_coordinates` in its first rows
+    """
+    ring: ScanRing
+    coordinates_buffer: NDArray[Shape["*, 3"], Float]
+    angles_buffer: NDArray[Shape["*"], Float]
+    thread: Optional[threading.Thread]
 
     def __init__(self):
+        self.ring = ScanRing()
+        self.thread = None
+        self.coordinates_buffer = np.empty((SCAN_CAPACITY, 3))
+        self.angles_buffer = np.empty(SCAN_CAPACITY)
         if not mock_robot:
             ydlidar.os_init()
             port = "/dev/ttyUSB0"
@@ -47,16 +153,24 @@ class Lidar:
             self.scan = None
 
     def get_lidar_coordinates(self, points_with_angle: NDArray[Shape["360, 3"], Float], robot_x: float, robot_y: float, robot_theta: float) -> NDArray[Shape["360, 3"], Float]:
-        coordinates_of_detection: list[list[float]] = []
-        for point in points_with_angle:
-            coordinates_of_detection.append(
-                [robot_x + point[1] * math.cos(robot_theta + point[0]), 
-                 robot_y + point[1] * math.sin(robot_theta + point[0]),
-                 point[2]]
-            )
-
-        return np.array(coordinates_of_detection)
-
+        """Coordinates (x, y, intensity) on the field of the points (angle, distance, intensity) seen from the robot.
+        The array returned is a view on a buffer reused by the next call.
+        """
+        if len(points_with_angle) == 0:
+            return np.array([])
+        count = len(points_with_angle)
+        self.coordinates_buffer = reserve(self.coordinates_buffer, count)
+        coordinates = self.coordinates_buffer[:count]
+        self.angles_buffer = reserve(self.angles_buffer, count)
+        angles = self.angles_buffer[:count]
+        np.add(points_with_angle[:, 0], robot_theta, out=angles)
+        np.cos(angles, out=coordinates[:, 0])
+        np.sin(angles, out=coordinates[:, 1])
+        np.multiply(coordinates[:, :2], points_with_angle[:, 1:2], out=coordinates[:, :2])
+        coordinates[:, 0] += robot_x
+        coordinates[:, 1] += robot_y
+        coordinates[:, 2] = points_with_angle[:, 2]
+        return coordinates
 
     def filter_on_field(self, coordinates_of_detection: NDArray[Shape["360, 3"], Float]) -> NDArray[Shape["200, 1"], Bool]:
         if len(coordinates_of_detection) == 0:
@@ -74,16 +188,41 @@ class Lidar:
             raise ValueError()
 
 
-    def scan_points(self) -> NDArray[Shape["360, 3"], Float]:
-        if self.scan is not None:
-            r = self.laser.doProcessSimple(self.scan)
-            if r:
-                numpy_points = np.array([[math.pi - p.angle if p.angle >= 0 else -math.pi - p.angle, p.range * 1000 if p.range > 0 else np.inf, p.intensity] for p in self.scan.points])
-                return numpy_points
+    def convert_scan(self, points: Sized, buffer: NDArray[Shape["*, 3"], Float]) -> NDArray[Shape["360, 3"], Float]:
+        """Points (angle, distance, intensity) of the `LaserPoint` of a scan, the angle from the front of the robot
+        and the distance in mm, infinite when there is no detection.
+        The array returned is a view on `buffer`, which must have a row for each point.
+        """
+        count = len(points)
+        raw = np.fromiter(map(POINT_FIELDS, points), dtype=np.dtype((float, 3)), count=count)
+        numpy_points = buffer[:count]
+        # The lidar is mounted backwards: pi - angle if angle >= 0 else -pi - angle
+        numpy_points[:, 0] = np.where(raw[:, 0] >= 0, np.pi, -np.pi)
+        numpy_points[:, 0] -= raw[:, 0]
+        np.multiply(raw[:, 1], 1000, out=numpy_points[:, 1])
+        numpy_points[raw[:, 1] <= 0, 1] = np.inf
+        numpy_points[:, 2] = raw[:, 2]
+        return numpy_points
+
+    def start(self) -> None:
+        """Start the acquisition thread, if the lidar is available"""
+        if self.scan is None or self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.acquire, daemon=True)
+        self.thread.start()
+
+    def acquire(self) -> None:
+        """Read the scans into the ring, doing nothing else so that no scan is missed"""
+        while True:
+            if self.laser.doProcessSimple(self.scan):
+                timestamp = time.time()
+                points = self.scan.points
+                self.ring.publish(self.convert_scan(points, self.ring.next_slot(len(points))), timestamp)
             else:
                 logging_error("Unable to read lidar")
-                return np.array([])
-        else:
-            return np.array([])
+
+    def wait_scan(self, sequence: int, timeout: float) -> Optional[LidarScan]:
+        """Next scan after the scan `sequence` (0 for the first one), None if the lidar gave none within `timeout` seconds"""
+        return self.ring.wait_after(sequence, timeout)
 
 lidar = Lidar() # Singleton
\ No newline at end of file
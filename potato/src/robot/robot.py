@@ -11,10 +11,13 @@ from src.playing_area import playing_area
 from src.robot.robot_actuator import create_robot_binary_actuator
 from src.robot.robot_stepper_motors import create_stepper_motors
 from src.robot.robot_switch_reader import create_switch_reader
-from src.robot.lidar import lidar, LidarDirection
+from src.robot.lidar import SCAN_TIMEOUT, lidar, LidarDirection
 from src.location.location import AbsoluteCoordinates, SideRelatedCoordinates, MoveForward
 from src.logging import logging_debug, logging_info, logging_error
+from src.occupancy_grid import occupancy_grid
+from src.opponent_detection import opponent_detector
 from src.path_smoother import smooth_path
+from src.planner_worker import planner_worker
 from src.replay.base_classes import ReplayEvent, EventType
 from src.replay.save_replay import log_replay
 from src.screen import screen
@@ -144,6 +147,7 @@ class Robot:
         thread_read_serial.start()
 
         # Always have lidar scannong
+        lidar.start()
         thread_lidar = threading.Thread(target=self.handle_lidar)
         thread_lidar.start()
 
@@ -254,6 +258,7 @@ class Robot:
         cone_angle = math.pi / 3
 
         last_replay_log = 0
+        last_sequence = 0
         while self.start_time == 0 or self.get_current_time() <= MATCH_TIME:
             current_time = self.get_current_time()
             if current_time > 0:
@@ -262,15 +267,26 @@ class Robot:
                     time.sleep(0.1)
                     continue
 
+                # Wait for a scan not processed yet, read without copy in the ring of the acquisition thread
+                scan = lidar.wait_scan(last_sequence, SCAN_TIMEOUT)
+                if scan is None and lidar.scan is not None:
+                    continue
+                last_sequence = scan.sequence if scan is not None else last_sequence
+                # The time of the scan itself, for the velocity of the opponent
+                current_time = scan.timestamp - self.start_time if scan is not None else current_time
                 location = self.current_location.getLocation(0, 0, 0)
                 if location is None:
                     raise ValueError()
                 (x, y, theta) = location
-                points_with_angle = lidar.scan_points()
+                points_with_angle = scan.points if scan is not None else np.array([])
                 points_with_coordinates = lidar.get_lidar_coordinates(points_with_angle, x, y, theta)
                 field_filter = lidar.filter_on_field(points_with_coordinates)
                 points_with_angle = points_with_angle[field_filter, :] if len(field_filter) > 0 else points_with_angle
                 points_with_coordinates = points_with_coordinates[field_filter, :] if len(field_filter) > 0 else points_with_coordinates
+                mapped_points = points_with_coordinates[points_with_coordinates[:, 2] > 200, :] if len(points_with_coordinates) > 0 else points_with_coordinates
+                occupancy_grid.integrate(x, y, mapped_points, current_time)
+                playing_area.set_lidar_obstacles(occupancy_grid.occupied())
+                opponent_detector.update(x, y, mapped_points, current_time)
                 direction_filter = lidar.filter_direction(points_with_angle, direction, cone_angle)
                 points_with_angle = points_with_angle[direction_filter, :] if len(direction_filter) > 0 else points_with_angle
                 points_with_coordinates = points_with_coordinates[direction_filter, :] if len(direction_filter) > 0 else points_with_coordinates
@@ -302,8 +318,6 @@ class Robot:
                         self.stepper_motors.write(self.last_instruction)
                         logging_info(f"Restarting since object is gone: {minimum_distance}")
 
-                time.sleep(0.1)
-
     def handle_plant_detection(self, detection_value: int, canal: PlantCanal):
         if canal.servo_id() in self.state.plant_canal_running and detection_value > PLANT_DETECTION_THRESHOLD:
             self.state.plant_canal_running.remove(canal.servo_id())
@@ -358,6 +372,7 @@ class Robot:
                         )
                     )
                     self.current_location = AbsoluteCoordinates(x, y, theta)
+                    planner_worker.set_start(x, y)
                 except Exception as ex:
                     logging_error(f"Exception while parsing robot: {ex}")
                     logging_error(f"With input {res}")
@@ -388,10 +403,12 @@ class Robot:
         self.stepper_motors.write(instruction)
         self.robot_movement = cause
 
-    def send_d_star_path(self, path: list[tuple[float, float]], x: float, y: float, theta: float, backwards: bool, forced_angle: bool):
+    def send_d_star_path(self, path: list[tuple[float, float]], x: float, y: float, theta: float, backwards: bool, forced_angle: bool, smooth: bool = True):
+        """Send the path of the planner (in cells) to the stepper motors.
+        The corners of an any-angle path (`ThetaStar`) are already few, they are sent as they are with `smooth` false."""
         logging_debug(str(path))
         instruction = ""
-        smoothed_path = smooth_path(path) if len(path) > 1 else path
+        smoothed_path = smooth_path(path) if smooth and len(path) > 1 else path
         for point in smoothed_path:
             log_replay(
                 ReplayEvent(
@@ -403,10 +420,15 @@ class Robot:
                 instruction += ","
             instruction += f"({round(point[0]*D_STAR_FACTOR, 2)};{round(point[1]*D_STAR_FACTOR, 2)};{0};{'1' if backwards else '0'};0)"
 
-            instruction += f",({x};{y};{theta};{'1' if backwards else '0'};{'1' if forced_angle else '0'})\n"
-            self.last_instruction = instruction
-            self.stepper_motors.write(instruction)
-            self.robot_movement = RobotMovement.IS_MOVING_BACKWARD if backwards else RobotMovement.IS_MOVING_FORWARD
+        instruction += f",({x};{y};{theta};{'1' if backwards else '0'};{'1' if forced_angle else '0'})\n"
+        self.last_instruction = instruction
+        self.robot_movement = RobotMovement.IS_MOVING_BACKWARD if backwards else RobotMovement.IS_MOVING_FORWARD
+        self.stepper_motors.write(instruction)
+
+    async def wait_end_of_movement(self) -> None:
+        """Returns when the Arduino has sent "DONE"."""
+        while self.robot_movement != RobotMovement.FINISH_MOVING: #type: ignore
+            await asyncio.sleep(0.2)
 
     async def go_to(
         self, x: float, y: float, theta: float, backwards: bool, forced_angle: bool, on_the_spot: bool, max_speed: int, max_acceleration: int, precision: bool
@@ -423,9 +445,7 @@ class Robot:
         self.last_instruction = instruction
         self.robot_movement = RobotMovement.IS_MOVING_BACKWARD if backwards else RobotMovement.IS_MOVING_FORWARD
         self.stepper_motors.write(instruction)
-        while self.robot_movement != RobotMovement.FINISH_MOVING: #type: ignore
-            await asyncio.sleep(0.2)
-        return
+        await self.wait_end_of_movement()
 
 
 robot = Robot() # Singleton
\ No newline at end of file
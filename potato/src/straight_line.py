@@ -0,0 +1,39 @@
+import math
+import numpy as np
+from nptyping import NDArray, Float, Int, Shape
+
+# Decimals kept on the points where the segment crosses the grid lines, so that a crossing on a corner is seen as one
+CROSSING_DECIMALS = 9
+
+def supercover(a: tuple[float, float], b: tuple[float, float], width: int, depth: int) -> NDArray[Shape["*, 2"], Int]:
+    """Cells of a `width` x `depth` grid touched by the segment from `a` to `b` (in cells, the cell (i, j) covers [i, i+1[ x [j, j+1[)
+
+    Every cell the segment goes through, or only touches on a side or a corner, is in the supercover.
+    The points where the segment crosses the grid lines are computed all at once instead of stepping from cell to cell:
+    each cell touched has one of them on its border.
+    """
+    (dx, dy) = (b[0] - a[0], b[1] - a[1])
+    crossings = [np.array([0.0, 1.0])]
+    if dx != 0:
+        crossings.append((np.arange(math.floor(min(a[0], b[0])) + 1, math.ceil(max(a[0], b[0]))) - a[0]) / dx)
+    if dy != 0:
+        crossings.append((np.arange(math.floor(min(a[1], b[1])) + 1, math.ceil(max(a[1], b[1]))) - a[1]) / dy)
+    t = np.concatenate(crossings)
+    x = np.round(a[0] + t * dx, CROSSING_DECIMALS)
+    y = np.round(a[1] + t * dy, CROSSING_DECIMALS)
+    # A point on a grid line touches the cells on both sides of it
+    (x_low, x_high) = (np.ceil(x) - 1, np.floor(x))
+    (y_low, y_high) = (np.ceil(y) - 1, np.floor(y))
+    cells = np.concatenate([
+        np.column_stack((x_low, y_low)),
+        np.column_stack((x_low, y_high)),
+        np.column_stack((x_high, y_low)),
+        np.column_stack((x_high, y_high)),
+    ]).astype(int)
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < width) & (cells[:, 1] >= 0) & (cells[:, 1] < depth)
+    return np.unique(cells[inside], axis=0)
+
+def segment_is_clear(costs: NDArray[Shape["60,40"], Float], a: tuple[float, float], b: tuple[float, float]) -> bool:
+    """Whether every cell of `costs` touched by the segment from `a` to `b` (in cells) is free (cost 1)"""
+    cells = supercover(a, b, *costs.shape)
+    return bool(np.all(costs[cells[:, 0], cells[:, 1]] <= 1))
@@ -0,0 +1,110 @@
+import math
+import numpy as np
+from nptyping import NDArray, Float, Shape
+
+from src.d_star import State
+from src.grid_topology import CONNBR_DIRECTIONS, get_grid_topology
+from src.helpers.indexed_heap import IndexedHeap
+
+# Length of the step towards each neighbour, in the `CONNBR_DIRECTIONS` order
+STEP_LENGTHS = [math.hypot(dx, dy) for (dx, dy) in CONNBR_DIRECTIONS]
+# Points checked per cell along a segment by `line_of_sight`
+SAMPLES_PER_CELL = 4
+
+def line_of_sight(costs: NDArray[Shape["60,40"], Float], a: tuple[int, int], b: tuple[int, int]) -> bool:
+    """Whether the segment between the cells `a` and `b` only crosses free cells (cost 1)"""
+    samples = max(abs(b[0] - a[0]), abs(b[1] - a[1])) * SAMPLES_PER_CELL + 1
+    x = np.rint(np.linspace(a[0], b[0], samples)).astype(int)
+    y = np.rint(np.linspace(a[1], b[1], samples)).astype(int)
+    return bool(np.all(costs[x, y] <= 1))
+
+class ThetaStar:
+    """Any-angle planner (Theta*): a cell can take as parent the parent of its neighbour when the segment between them is free.
+
+    The path is a few straight segments between the corners of the obstacles, instead of one point per cell like `DStarLight`.
+    Away from the free cells (start inside an obstacle), the steps follow the grid and cost the cost of the cell they leave.
+
+    Attributes
+    ----------
+    g: NDArray[(60, 40), Float]
+        Cost from `s_start` to each expanded cell
+
+    parent: NDArray[(2400,), Int]
+        Id of the parent of each cell, -1 if it has not been reached
+
+    expansions: int
+        Number of cells expanded
+    """
+    s_start: State
+    s_goal: State
+    costs: NDArray[Shape["60,40"], Float]
+    g: NDArray[Shape["60,40"], Float]
+    u: IndexedHeap[float, int]
+    expansions: int
+    path: NDArray[Shape["*, 2"], Float]
+
+    def __init__(self, s_start: State, s_goal: State, costs: NDArray[Shape["60,40"], Float]) -> None:
+        self.topology = get_grid_topology(*costs.shape)
+        self.s_start = s_start
+        self.s_goal = s_goal
+        self.costs = costs
+        self._g = np.full(self.topology.size, np.inf)
+        self.g = self._g.reshape(costs.shape)
+        self.parent = np.full(self.topology.size, -1)
+        self.u = IndexedHeap()
+        self.expansions = 0
+        self.path = np.empty((0, 2))
+
+    def heuristic(self, s: int) -> float:
+        (x, y) = self.topology.coordinates(s)
+        return math.hypot(self.s_goal.value[0] - x, self.s_goal.value[1] - y)
+
+    def distance(self, s: int, t: int) -> float:
+        (x_s, y_s) = self.topology.coordinates(s)
+        (x_t, y_t) = self.topology.coordinates(t)
+        return math.hypot(x_t - x_s, y_t - y_s)
+
+    def compute_shortest_path(self) -> None:
+        start = self.topology.to_id(*self.s_start.value)
+        goal = self.topology.to_id(*self.s_goal.value)
+        flat_costs = np.ravel(self.costs)
+        closed = np.zeros(self.topology.size, dtype=bool)
+        self._g[start] = 0
+        self.parent[start] = start
+        self.u.push(start, self.heuristic(start))
+        while len(self.u) > 0:
+            _, s = self.u.pop()
+            if s == goal:
+                break
+            closed[s] = True
+            self.expansions += 1
+            for (k, t) in enumerate(self.topology.neighbours[s].tolist()):
+                if t < 0 or closed[t] or flat_costs[t] == np.inf:
+                    continue
+                parent = int(self.parent[s])
+                if line_of_sight(self.costs, self.topology.coordinates(parent), self.topology.coordinates(t)):
+                    # Path 2: straight from the parent of `s`
+                    (g, new_parent) = (self._g[parent] + self.distance(parent, t), parent)
+                else:
+                    (g, new_parent) = (self._g[s] + flat_costs[s] * STEP_LENGTHS[k], s)
+                if g < self._g[t]:
+                    self._g[t] = g
+                    self.parent[t] = new_parent
+                    self.u.push(t, g + self.heuristic(t))
+        self.u.clear()
+
+    def get_path(self) -> NDArray[Shape["*, 2"], Float]:
+        """Corners of the path from `s_start` to `s_goal`, as an (N, 2) array of grid coordinates
+
+        Raises a `ValueError` if the goal has not been reached.
+        """
+        start = self.topology.to_id(*self.s_start.value)
+        s = self.topology.to_id(*self.s_goal.value)
+        if self.parent[s] < 0:
+            raise ValueError(f"No path from {self.s_start} to {self.s_goal}")
+        path = [s]
+        while s != start:
+            s = int(self.parent[s])
+            path.append(s)
+        self.path = np.array([self.topology.coordinates(s) for s in reversed(path)], dtype=float)
+        return self.path
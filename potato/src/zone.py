@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from functools import lru_cache
 from math import floor, ceil, fabs, sqrt
 import numpy as np
 from nptyping import NDArray, Bool, Shape
@@ -7,6 +8,37 @@ from typing import Self
 
 from src.constants import ROBOT_DEPTH, ROBOT_WIDTH, PLAYING_AREA_DEPTH, PLAYING_AREA_WIDTH, D_STAR_FACTOR
 
+# Cells of the planner grid covered by a zone, as slices on both axes
+Window = tuple[slice, slice]
+# Masks kept by `rectangle_window_mask` and `circle_window_mask`
+MASK_CACHE_SIZE = 1024
+
+def grid_shape(resolution: int) -> tuple[int, int]:
+    return (int(PLAYING_AREA_WIDTH / resolution), int(PLAYING_AREA_DEPTH / resolution))
+
+def clipped_window(x_min: int, x_max: int, y_min: int, y_max: int, resolution: int) -> Window:
+    """Window of the cells from (x_min, y_min) to (x_max, y_max) included, inside the grid"""
+    (width, depth) = grid_shape(resolution)
+    x_start = min(max(x_min, 0), width)
+    y_start = min(max(y_min, 0), depth)
+    return (slice(x_start, max(x_start, min(x_max + 1, width))), slice(y_start, max(y_start, min(y_max + 1, depth))))
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def rectangle_window_mask(x_min: int, y_min: int, x_max: int, y_max: int, resolution: int) -> tuple[Window, NDArray[Shape["*, *"], Bool]]:
+    window = clipped_window(x_min, x_max, y_min, y_max, resolution)
+    mask = np.full((window[0].stop - window[0].start, window[1].stop - window[1].start), True)
+    mask.flags.writeable = False
+    return (window, mask)
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def circle_window_mask(x_center: int, y_center: int, radius: float, resolution: int) -> tuple[Window, NDArray[Shape["*, *"], Bool]]:
+    reach = floor(radius)
+    window = clipped_window(x_center - reach, x_center + reach, y_center - reach, y_center + reach, resolution)
+    X, Y = np.ogrid[window[0], window[1]]
+    mask = np.ceil(np.sqrt((X - x_center)**2 + (Y - y_center)**2)) <= radius
+    mask.flags.writeable = False
+    return (window, mask)
+
 
 def add(a: tuple[float, float], b: tuple[float, float]) -> tuple[float, float]:
     return (a[0] + b[0], a[1] + b[1])
@@ -30,8 +62,19 @@ class Zone(ABC):
         raise NotImplementedError()
     
     @abstractmethod
-    def points_in_zone(self) -> NDArray[Shape["300,200"], Bool]:
+    def window_mask(self, resolution: int = D_STAR_FACTOR) -> tuple[Window, NDArray[Shape["*, *"], Bool]]:
+        """Window of the bounding box of the zone on the planner grid (cells of `resolution` mm), and the cells of the window inside the zone.
+
+        The masks are shared between zones with the same cells, they must not be modified.
+        """
         raise NotImplementedError()
+
+    def points_in_zone(self, resolution: int = D_STAR_FACTOR) -> NDArray[Shape["60,40"], Bool]:
+        """Cells of the planner grid inside the zone, for a grid with cells of `resolution` mm"""
+        (window, mask) = self.window_mask(resolution)
+        array = np.full(grid_shape(resolution), False)
+        array[window] = mask
+        return array
     
     class Rounding(Enum):
         Minimum = 0
@@ -45,6 +88,11 @@ class Zone(ABC):
         else:
             return ceil(coordinate)
 
+    @abstractmethod
+    def geometry(self) -> tuple[float, ...]:
+        """Values defining the zone, two zones with the same type and geometry cover the same cells"""
+        raise NotImplementedError()
+
     @abstractmethod  
     def intersect_with_line(self, a: tuple[float, float], b: tuple[float, float]) -> bool:
         raise NotImplementedError()
@@ -73,20 +121,33 @@ class Rectangle(Zone):
     def center(self) -> tuple[float, float]:
         return ((self._x_min + self._x_max) / 2, (self._y_min + self._y_max) / 2)
     
-    def points_in_zone(self) -> NDArray[Shape["60,40"], Bool]:
-        array = np.full((int(PLAYING_AREA_WIDTH / D_STAR_FACTOR), int(PLAYING_AREA_DEPTH / D_STAR_FACTOR)), False)
-        x_min = self.int_coordinates(self._x_min / D_STAR_FACTOR, Zone.Rounding.Minimum)
-        x_max = self.int_coordinates(self._x_max / D_STAR_FACTOR, Zone.Rounding.Maximum)
-        y_min = self.int_coordinates(self._y_min / D_STAR_FACTOR, Zone.Rounding.Minimum)
-        y_max = self.int_coordinates(self._y_max / D_STAR_FACTOR, Zone.Rounding.Maximum)
-        array[x_min:x_max+1, y_min:y_max+1] = True
-        return array
+    def window_mask(self, resolution: int = D_STAR_FACTOR) -> tuple[Window, NDArray[Shape["*, *"], Bool]]:
+        x_min = self.int_coordinates(self._x_min / resolution, Zone.Rounding.Minimum)
+        x_max = self.int_coordinates(self._x_max / resolution, Zone.Rounding.Maximum)
+        y_min = self.int_coordinates(self._y_min / resolution, Zone.Rounding.Minimum)
+        y_max = self.int_coordinates(self._y_max / resolution, Zone.Rounding.Maximum)
+        return rectangle_window_mask(x_min, y_min, x_max, y_max, resolution)
     
+    def geometry(self) -> tuple[float, ...]:
+        return (self._x_min, self._y_min, self._x_max, self._y_max)
+
     def __str__(self) -> str:
         return f"Rectangle ({self._x_min},{self._y_min}) -> ({self._x_max, self._y_max})"
     
     def intersect_with_line(self, a: tuple[float, float], b: tuple[float, float]) -> bool:
-        return super().intersect_with_line(a, b) # TODO
+        # Liang-Barsky: clip the range [0, 1] of the segment parameter with each side of the rectangle
+        (t_min, t_max) = (0.0, 1.0)
+        ab = sub(b, a)
+        for (p, q) in [(-ab[0], a[0] - self._x_min), (ab[0], self._x_max - a[0]), (-ab[1], a[1] - self._y_min), (ab[1], self._y_max - a[1])]:
+            if p == 0:
+                # Parallel to this side, and outside of it
+                if q < 0:
+                    return False
+            elif p < 0:
+                t_min = max(t_min, q / p)
+            else:
+                t_max = min(t_max, q / p)
+        return t_min <= t_max
     
 class Circle(Zone):
     x_center: float
@@ -102,23 +163,20 @@ class Circle(Zone):
         robot_max_dimension = max(ROBOT_DEPTH, ROBOT_WIDTH) / 2
         return Circle(self.x_center, self.y_center, self._radius + robot_max_dimension)
     
-    def points_in_zone(self) -> NDArray[Shape["60,40"], Bool]:
-        x_center = int(self.x_center / D_STAR_FACTOR)
-        y_center = int(self.y_center / D_STAR_FACTOR)
-        radius = self._radius / D_STAR_FACTOR
-        width = int(PLAYING_AREA_WIDTH / D_STAR_FACTOR)
-        height = int(PLAYING_AREA_DEPTH / D_STAR_FACTOR)
-        X, Y = np.ogrid[:width, :height]
-        dist_from_center = np.sqrt((X-x_center)**2 + (Y-y_center)**2)
-        mask = np.ceil(dist_from_center) <= radius
-        return mask
+    def window_mask(self, resolution: int = D_STAR_FACTOR) -> tuple[Window, NDArray[Shape["*, *"], Bool]]:
+        return circle_window_mask(int(self.x_center / resolution), int(self.y_center / resolution), self._radius / resolution, resolution)
     
+    def geometry(self) -> tuple[float, ...]:
+        return (self.x_center, self.y_center, self._radius)
+
     def __str__(self) -> str:
         return f"Circle center({self.x_center},{self.y_center}) radius {self._radius}"
     
     def distance_segment_to_point(self, a: tuple[float, float], b: tuple[float, float]) -> float:
         # https://stackoverflow.com/a/1079478
         c = (self.x_center, self.y_center)
+        if a == b:
+            return sqrt(hypot2(c, a))
         
         # Compute vectors AC and AB
         ac = sub(c, a)
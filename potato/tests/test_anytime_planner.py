@@ -0,0 +1,31 @@
+from src.anytime_planner import AnytimePlanner
+from src.constants import Side
+from src.d_star import ArrayDStarLight, State
+from src.playing_area import PlayingArea, BIG_NUMBER
+
+def blue_area() -> PlayingArea:
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    return area
+
+def test_first_path_then_shortest():
+    area = blue_area()
+    (start, goal) = (State(2, 38), State(58, 2))
+    planner = AnytimePlanner(start, goal, area.cost.copy())
+    assert planner.plan(0) is None
+
+    planner.epsilons = planner.epsilons[:1]
+    path = planner.plan(10)
+    assert path is not None and planner.path_epsilon == 3.0
+    first_expansions = planner.d_star.expansions
+
+    fresh = ArrayDStarLight(start, goal, area.cost.copy())
+    fresh.compute_shortest_path(False)
+    assert first_expansions < fresh.expansions / 4
+
+    planner.epsilons = [2.0, 1.5, 1.0]
+    planner.keep_improving().join()
+    assert planner.path_epsilon == 1.0
+    assert planner.d_star.g[start.value] <= fresh.g[start.value] * 1.01
+    assert all(area.cost[int(x), int(y)] < BIG_NUMBER for (x, y) in planner.path)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.constants import Side
+from src.cost_atlas import CostAtlas
+from src.playing_area import PlayingArea, BIG_NUMBER
+
+def blue_area() -> PlayingArea:
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    return area
+
+def test_descent_reaches_goal():
+    area = blue_area()
+    atlas = CostAtlas(area)
+    planter = area.planters[1]
+    field = atlas.field(planter)
+    goal = atlas.goal_zone(planter).points_in_zone()
+    assert np.all(field.values[goal] == 0)
+
+    path = atlas.path(planter, (30, 2))
+    assert tuple(path[0]) == (30, 2)
+    assert goal[int(path[-1][0]), int(path[-1][1])]
+    assert all(area.cost[int(x), int(y)] < BIG_NUMBER or goal[int(x), int(y)] for (x, y) in path)
+
+def test_fields_dropped_when_costs_change():
+    area = blue_area()
+    atlas = CostAtlas(area)
+    atlas.build()
+    assert len(atlas.fields) == len(atlas.goals())
+
+    area.set_other_robot_position(1500, 1000)
+    assert atlas.travel_cost(area.planters[1], 300, 300) is None
+    assert len(atlas.fields) < len(atlas.goals())
+
+    atlas.build()
+    fresh = CostAtlas(area).field(area.planters[1])
+    assert np.array_equal(atlas.field(area.planters[1]).values, fresh.values)
+
+def test_ranking_uses_travel_cost():
+    area = blue_area()
+    atlas = CostAtlas(area)
+    atlas.build()
+    (x, y) = (1500, 1000)
+    by_distance = area.get_closest_plant(x, y, 0)
+    by_cost = area.get_closest_plant(x, y, 0, atlas.travel_cost)
+    costs = [atlas.travel_cost(plant_area, x, y) for plant_area in area.plant_areas if plant_area.has_plants]
+    assert atlas.travel_cost(by_cost, x, y) == min(costs)
+    assert by_distance is not None
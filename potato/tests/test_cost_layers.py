@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.constants import Side
+from src.playing_area import PlayingArea
+
+def test_layers_match_full_rebuild():
+    area = PlayingArea()
+    rng = np.random.default_rng(1)
+    for k in range(100):
+        area.side = Side.YELLOW if k % 7 == 0 else Side.BLUE
+        if k % 5 == 0:
+            area.plant_areas[rng.integers(6)].has_plants ^= True
+        if k % 11 == 0:
+            area.pot_areas[rng.integers(6)].has_pots ^= True
+        if k % 2 == 0:
+            area.set_other_robot_position(*rng.uniform(0, 3000, 2))
+        else:
+            area.compute_costs()
+        assert np.array_equal(area.cost, area.costs_at_resolution(50))
+
+def test_only_changed_layers_are_computed():
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    cost = area.cost
+    layers = dict(area.cost_map.layers)
+    area.compute_costs()
+    assert area.cost is cost
+
+    area.set_other_robot_position(1500, 1000)
+    assert area.cost is not cost and not np.array_equal(area.cost, cost)
+    assert all(area.cost_map.layers[key] is layer for (key, layer) in layers.items() if key != "other_robot")
+    assert area.cost_map.dirty is None
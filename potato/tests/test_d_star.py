@@ -0,0 +1,145 @@
+import numpy as np
+
+from src.constants import COMPACT_DTYPE, D_STAR_FACTOR, Side
+from src.d_star import ArrayDStarLight, DStarLight, Instrumentation, State, WIDTH, DEPTH, set_instrumentation
+from src.playing_area import playing_area
+from src.replay.base_classes import EventType
+from src.theta_star import ThetaStar, line_of_sight
+
+def walls_costs():
+    costs = np.ones((WIDTH,DEPTH))
+    costs[25,5:20] = np.inf
+    costs[15, 0:10] = np.inf
+    costs[5:10,5] = np.inf
+    return costs
+
+def first_path(engine, costs, start: tuple[int, int], goal: tuple[int, int]):
+    d_star = engine(State(*start), State(*goal), costs.copy())
+    d_star.compute_shortest_path(False)
+    return d_star, d_star.get_path().tolist()
+
+def test_same_path_as_state_engine():
+    for side in [Side.BLUE, Side.YELLOW]:
+        playing_area.side = side
+        playing_area.compute_costs()
+        for (start, goal) in [((5, 5), (55, 35)), ((2, 20), (57, 20)), ((55, 3), (4, 36))]:
+            _, expected = first_path(DStarLight, playing_area.cost, start, goal)
+            _, path = first_path(ArrayDStarLight, playing_area.cost, start, goal)
+            assert path == expected
+
+def test_same_path_after_obstacle():
+    paths = []
+    for engine in [DStarLight, ArrayDStarLight]:
+        d_star, path = first_path(engine, walls_costs(), (0, 0), (WIDTH - 1, DEPTH - 1))
+        d_star.s_start = State(int(path[15][0]), int(path[15][1]))
+        obstacles = [State(40, y) for y in range(20, 26)]
+        for obstacle in obstacles:
+            d_star.costs[obstacle.value] = np.inf
+        d_star.add_obstacles(obstacles)
+        paths.append((path, d_star.get_path().tolist()))
+    assert paths[0] == paths[1]
+
+def test_path_array():
+    d_star, _ = first_path(ArrayDStarLight, walls_costs(), (0, 0), (WIDTH - 1, DEPTH - 1))
+    path = d_star.get_path()
+    assert path.shape[1] == 2
+    assert path[0].tolist() == [0, 0]
+    assert (int(path[-1, 0]), int(path[-1, 1])) == (WIDTH - 1, DEPTH - 1)
+    # Consecutive points are on the border of the square around the previous cell
+    steps = np.abs(path[1:] - np.floor(path[:-1]))
+    assert np.all(np.max(steps, axis=1) == 1)
+
+def test_grid_topology_is_shared():
+    first, _ = first_path(ArrayDStarLight, walls_costs(), (0, 0), (WIDTH - 1, DEPTH - 1))
+    second, _ = first_path(ArrayDStarLight, walls_costs(), (3, 3), (10, 10))
+    assert first.topology is second.topology
+    reference, _ = first_path(DStarLight, walls_costs(), (0, 0), (WIDTH - 1, DEPTH - 1))
+    assert reference.topology is first.topology
+    topology = first.topology
+    assert topology.prev(topology.to_id(0, 0)) == [topology.to_id(1, 1), topology.to_id(0, 1), topology.to_id(1, 0)]
+    assert len(topology.prev(topology.to_id(5, 5))) == 8
+    assert topology.on_border.sum() == 2 * (WIDTH + DEPTH) - 4
+
+def test_repair_blocked_corridor():
+    d_star, _ = first_path(ArrayDStarLight, np.ones((WIDTH, DEPTH)), (5, 20), (55, 20))
+    first_g = d_star.g[5, 20]
+    wall = [State(30, y) for y in range(15, 26)]
+    for cell in wall:
+        d_star.costs[cell.value] = np.inf
+    expansions = d_star.expansions
+    d_star.repair(wall)
+    path = d_star.get_path()
+
+    fresh, _ = first_path(ArrayDStarLight, d_star.costs, (5, 20), (55, 20))
+    # The first search only interpolates with the pairs around the first successor of each cell,
+    # so the g of two searches on the same map can differ by a fraction of a cell
+    assert abs(d_star.g[5, 20] - fresh.g[5, 20]) < 0.2
+    assert d_star.expansions - expansions < fresh.expansions
+    assert all(d_star.costs[int(x), int(y)] != np.inf for (x, y) in path)
+
+    for cell in wall:
+        d_star.costs[cell.value] = 1
+    d_star.repair(wall)
+    assert abs(d_star.g[5, 20] - first_g) < 0.2
+
+def test_theta_star_corners():
+    costs = walls_costs()
+    theta_star = ThetaStar(State(0, 0), State(WIDTH - 1, DEPTH - 1), costs.copy())
+    theta_star.compute_shortest_path()
+    path = theta_star.get_path()
+    _, grid_path = first_path(ArrayDStarLight, costs, (0, 0), (WIDTH - 1, DEPTH - 1))
+    assert path[0].tolist() == [0, 0] and path[-1].tolist() == [WIDTH - 1, DEPTH - 1]
+    assert len(path) < len(grid_path) / 4
+    assert all(line_of_sight(costs, (int(a[0]), int(a[1])), (int(b[0]), int(b[1]))) for (a, b) in zip(path[:-1], path[1:]))
+    assert np.sum(np.hypot(*np.diff(path, axis=0).T)) <= np.sum(np.hypot(*np.diff(grid_path, axis=0).T))
+
+def test_instrumentation():
+    set_instrumentation(True)
+    d_star = ArrayDStarLight(State(0, 0), State(WIDTH - 1, DEPTH - 1), walls_costs())
+    set_instrumentation(False)
+    assert d_star.instrumentation is not None
+    d_star.instrumentation.detach()
+    assert "compute_shortest_path" not in vars(d_star)
+
+    events = []
+    Instrumentation(d_star, events.append)
+    d_star.compute_shortest_path(False)
+    path = d_star.get_path()
+    d_star.s_start = State(int(path[15][0]), int(path[15][1]))
+    obstacles = [State(40, y) for y in range(20, 26)]
+    for obstacle in obstacles:
+        d_star.costs[obstacle.value] = np.inf
+    d_star.add_obstacles(obstacles)
+
+    assert [event.event for event in events] == [EventType.PLANNER_STATS] * 3
+    assert [event.stats["phase"] for event in events] == ["compute", "path_extraction", "obstacle_repair"]
+    (compute, _, repair) = [event.stats for event in events]
+    assert sum(event.stats["expansions"] for event in events) == d_star.expansions
+    assert compute["update_vertex_calls"] > compute["expansions"]
+    assert compute["c_evaluations"] >= compute["update_vertex_calls"]
+    assert compute["max_queue_size"] > 0 and repair["duration"] > 0
+
+    _, expected = first_path(ArrayDStarLight, walls_costs(), (0, 0), (WIDTH - 1, DEPTH - 1))
+    assert path.tolist() == expected
+
+def test_compact_arrays():
+    for side in [Side.BLUE, Side.YELLOW]:
+        playing_area.side = side
+        playing_area.compute_costs()
+        compact_costs = playing_area.costs_at_resolution(D_STAR_FACTOR, compact=True)
+        assert compact_costs.dtype == COMPACT_DTYPE
+        for (start, goal) in [((5, 5), (55, 35)), ((2, 20), (57, 20)), ((55, 3), (4, 36)), ((20, 38), (58, 2))]:
+            d_star, expected = first_path(ArrayDStarLight, playing_area.cost, start, goal)
+            compact = ArrayDStarLight(State(*start), State(*goal), compact_costs.copy(), COMPACT_DTYPE)
+            compact.compute_shortest_path(False)
+            path = compact.get_path()
+            # Where two float64 keys are equal, the rounding can order them the other way: the path is as long and stays in the same cells
+            assert len(path) == len(expected) and path[0].tolist() == expected[0] and path[-1].tolist() == expected[-1]
+            assert np.max(np.abs(path - np.array(expected))) < 0.5
+            assert abs(np.sum(np.hypot(*np.diff(path, axis=0).T)) - np.sum(np.hypot(*np.diff(expected, axis=0).T))) < 1e-6
+
+    memory = d_star.array_bytes()
+    compact_memory = compact.array_bytes()
+    print(f"Planner arrays: {sum(memory.values())} bytes, compact: {sum(compact_memory.values())} bytes")
+    for name in ["g", "rhs", "costs"]:
+        assert compact_memory[name] * 2 == memory[name]
@@ -0,0 +1,19 @@
+from src.constants import Side
+from src.hierarchical_planner import HierarchicalPlanner
+from src.playing_area import PlayingArea, BIG_NUMBER
+
+def test_fine_path_inside_corridor():
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    planner = HierarchicalPlanner(area, coarse_resolution=50, fine_resolution=10)
+    path = planner.plan((300, 1800), (1300, 1100))
+    assert path[0].tolist() == [300, 1800]
+    assert [int(path[-1, 0] / 10), int(path[-1, 1] / 10)] == [130, 110]
+
+    fine_costs = area.costs_at_resolution(10)
+    assert fine_costs.shape == (300, 200)
+    assert all(fine_costs[int(x / 10), int(y / 10)] < BIG_NUMBER for (x, y) in path)
+    # The fine search only sees the window around the coarse route
+    assert planner.fine_planner is not None
+    assert planner.fine_planner.costs.size < fine_costs.size / 4
@@ -0,0 +1,34 @@
+import random
+
+from src.helpers.indexed_heap import IndexedHeap
+
+def test_pop_order_with_updates_and_removes():
+    random.seed(0)
+    heap: IndexedHeap[tuple[float, float], int] = IndexedHeap()
+    expected: dict[int, tuple[float, float]] = {}
+    for _ in range(2000):
+        item = random.randrange(200)
+        if item in expected and random.random() < 0.3:
+            heap.remove(item)
+            expected.pop(item)
+        else:
+            key = (random.random(), random.random())
+            heap.push(item, key)
+            expected[item] = key
+
+    popped: list[tuple[tuple[float, float], int]] = []
+    while len(heap) > 0:
+        popped.append(heap.pop())
+    assert popped == sorted((key, item) for item, key in expected.items())
+
+def test_counters():
+    heap: IndexedHeap[float, str] = IndexedHeap()
+    heap.push("a", 2)
+    heap.push("b", 3)
+    heap.push("a", 1)
+    assert "a" in heap
+    assert heap.top() == (1, "a")
+    heap.remove("b")
+    assert heap.pop() == (1, "a")
+    assert (heap.pushes, heap.updates, heap.removes, heap.pops) == (2, 1, 1, 1)
+    assert heap.operations() == 5
@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.constants import Side
+from src.d_star import ArrayDStarLight, DStarLight, State
+from src.jump_point_search import JumpPointSearch, select_engine
+from src.playing_area import BIG_NUMBER, PlayingArea
+
+def path_length(path) -> float:
+    return float(np.sum(np.hypot(*np.diff(path, axis=0).T)))
+
+def test_path_lengths_against_d_star():
+    for side in [Side.BLUE, Side.YELLOW]:
+        area = PlayingArea()
+        area.side = side
+        # Without the clearance penalties, so that the cost map is binary
+        costs = np.where(area.occupancy_at_resolution(50), BIG_NUMBER, 1.0)
+        for (start, goal) in [((5, 5), (50, 20)), ((30, 2), (5, 24)), ((20, 38), (58, 2))]:
+            d_star = DStarLight(State(*start), State(*goal), costs.copy())
+            d_star.compute_shortest_path(False)
+            expected = d_star.get_path()
+            jps = JumpPointSearch(State(*start), State(*goal), costs.copy())
+            jps.compute_shortest_path(False)
+            path = jps.get_path()
+
+            assert path[0].tolist() == list(start) and path[-1].tolist() == list(goal)
+            assert np.all(np.max(np.abs(np.diff(path, axis=0)), axis=1) == 1)
+            assert all(costs[int(x), int(y)] == 1 for (x, y) in path)
+            # 8-connected steps are at most 8% longer than the interpolated ones of Field D*
+            assert path_length(expected) <= path_length(path) * 1.01
+            assert path_length(path) <= path_length(expected) * 1.09
+            assert jps.expansions < d_star.expansions / 4
+
+def test_engine_selection():
+    costs = np.ones((60, 40))
+    costs[20:30, 10:30] = 10**10
+    assert select_engine(State(5, 5), State(50, 20), costs) is JumpPointSearch
+    assert select_engine(State(25, 20), State(50, 20), costs) is ArrayDStarLight
+    costs[40, 5] = 3
+    assert select_engine(State(5, 5), State(50, 20), costs) is ArrayDStarLight
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+
+from src.constants import Side
+from src.occupancy_grid import OccupancyGrid
+from src.playing_area import BIG_NUMBER, PlayingArea
+
+def wall_scan(points: int = 400) -> np.ndarray:
+    """Scan from (1500, 1000) of a wall at x = 2500 (in mm), with the intensity"""
+    y = np.linspace(300, 1700, points)
+    return np.column_stack((np.full(points, 2500.0), y, np.full(points, 250.0)))
+
+def test_hits_and_free_space():
+    grid = OccupancyGrid()
+    grid.integrate(1500, 1000, wall_scan(), 0)
+    assert not grid.occupied().any()
+    grid.integrate(1500, 1000, wall_scan(), 0.1)
+    occupied = grid.occupied()
+    assert occupied[50, 6:34].all() and occupied.sum() == occupied[50].sum()
+    assert grid.log_odds[40, 20] < 0 and grid.log_odds[31, 20] < 0
+
+    # The wall is forgotten without new scans
+    grid.integrate(1500, 1000, np.empty((0, 3)), 5)
+    assert not grid.occupied().any()
+
+def test_integration_time():
+    grid = OccupancyGrid()
+    scan = wall_scan()
+    begin = time.perf_counter()
+    for k in range(100):
+        grid.integrate(1500, 1000, scan, k / 12)
+    duration = (time.perf_counter() - begin) / 100
+    print(f"Scan of {len(scan)} points integrated in {duration * 1000:.3f} ms")
+    assert duration < 0.002
+
+def test_lidar_layer():
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    occupied = np.full(area.cost.shape, False)
+    occupied[30, 20] = True
+    area.set_lidar_obstacles(occupied)
+    assert area.cost[30, 20] == BIG_NUMBER and area.cost[32, 20] == BIG_NUMBER and 1 < area.cost[33, 20] < BIG_NUMBER
+    area.set_lidar_obstacles(np.full(area.cost.shape, False))
+    assert np.array_equal(area.cost, area.costs_at_resolution(50))
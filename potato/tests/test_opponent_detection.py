@@ -0,0 +1,43 @@
+import math
+import time
+import numpy as np
+
+from src.opponent_detection import OpponentDetector
+from src.opponent_tracker import OpponentTracker
+from src.constants import Side
+from src.playing_area import PlayingArea
+
+def arc(x: float, y: float, radius: float, robot: tuple[float, float], points: int) -> np.ndarray:
+    """Points (x, y, intensity) of the half of a circle seen from the robot"""
+    facing = math.atan2(robot[1] - y, robot[0] - x)
+    angles = np.linspace(facing - math.pi / 2, facing + math.pi / 2, points)
+    return np.column_stack((x + radius * np.cos(angles), y + radius * np.sin(angles), np.full(points, 250.0)))
+
+def scan(robot: tuple[float, float]) -> np.ndarray:
+    """Opponent at (2000, 1000), plants in the area at (1000, 1300), our mast, and the border at y = 0"""
+    border = np.column_stack((np.linspace(500, 2500, 200), np.zeros(200), np.full(200, 250.0)))
+    return np.vstack((arc(2000, 1000, 150, robot, 30), arc(1000, 1300, 30, robot, 8), arc(*robot, 60, robot, 10), border))
+
+def test_opponent_is_detected():
+    area = PlayingArea()
+    area.side = Side.BLUE
+    detector = OpponentDetector(area, OpponentTracker(area))
+    robot = (1000.0, 1000.0)
+    position = detector.update(*robot, scan(robot), 0)
+    assert position is not None and math.hypot(position[0] - 2000, position[1] - 1000) < 20
+    assert (area.other_robot.zone.x_center, area.other_robot.zone.y_center) == position
+
+    # Only table elements, the border and our robot
+    assert detector.detect(*robot, scan(robot)[30:]) is None
+
+def test_detection_time():
+    area = PlayingArea()
+    detector = OpponentDetector(area, OpponentTracker(area))
+    robot = (1000.0, 1000.0)
+    points = scan(robot)
+    begin = time.perf_counter()
+    for _ in range(100):
+        detector.detect(*robot, points)
+    duration = (time.perf_counter() - begin) / 100
+    print(f"Opponent detected in {duration * 1000:.3f} ms")
+    assert duration < 0.002
@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.constants import OPPONENT_CORRIDOR_COST, Side
+from src.opponent_tracker import OpponentTracker
+from src.playing_area import PlayingArea
+
+def tracked_area() -> PlayingArea:
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    return area
+
+def test_velocity_and_corridor():
+    area = tracked_area()
+    tracker = OpponentTracker(area, horizon=1.0)
+    # The opponent goes along x at 500 mm/s, seen at 12 Hz
+    for k in range(36):
+        tracker.update((1000 + 500 * k / 12, 1000), k / 12)
+    assert abs(tracker.velocity[0] - 500) < 50 and abs(tracker.velocity[1]) < 50
+    assert abs(area.other_robot.zone.x_center - 2458) < 50
+
+    # Where it goes is avoided, behind it is free
+    assert area.cost[55, 20] == OPPONENT_CORRIDOR_COST
+    assert area.cost[35, 20] < OPPONENT_CORRIDOR_COST
+
+def test_still_opponent_has_no_corridor():
+    area = tracked_area()
+    tracker = OpponentTracker(area)
+    for k in range(12):
+        tracker.update((1500, 1000), k / 12)
+    assert tracker.corridor() is None
+    assert np.array_equal(area.cost, area.costs_at_resolution(50))
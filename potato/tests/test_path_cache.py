@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.d_star import State
+from src.path_cache import PathCache
+
+def test_repeated_move_is_not_planned():
+    costs = np.ones((60, 40))
+    cache = PathCache(size=2)
+    path = cache.get_path(State(5, 5), State(50, 30), costs)
+    assert np.array_equal(cache.get_path(State(5, 5), State(50, 30), costs), path)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    costs[20:40, 10:30] = 10**10
+    cache.get_path(State(5, 5), State(50, 30), costs)
+    assert cache.misses == 2
+
+    cache.get_path(State(6, 5), State(50, 30), costs)
+    assert len(cache.paths) == 2
+    cache.get_path(State(5, 5), State(50, 30), np.ones((60, 40)))
+    assert cache.misses == 4
+
+def test_save_and_load(tmp_path):
+    costs = np.ones((60, 40))
+    cache = PathCache()
+    path = cache.get_path(State(5, 5), State(50, 30), costs)
+    cache.save(str(tmp_path / "paths.json"))
+
+    loaded = PathCache()
+    loaded.load(str(tmp_path / "paths.json"))
+    assert np.array_equal(loaded.get_path(State(5, 5), State(50, 30), costs), path)
+    assert (loaded.hits, loaded.misses) == (1, 0)
@@ -10,6 +10,8 @@ from queue import PriorityQueue
 import time
 from typing import Self
 
+import src.d_star as d_star_engine
+
 WIDTH = 60
 DEPTH = 40
 class State:
@@ -443,8 +445,25 @@ def main():
     pl.plot(x, y, '-r')
     pl.imshow(costs.transpose() > 1, aspect='auto', interpolation='nearest' )
     pl.show()
+    print_engine_counters(costs)
     print("END")
 
+def print_engine_counters(costs: NDArray[Shape["60,40"], Float]):
+    """Same scenarios with the planner of `src.d_star`, to compare its expansions and heap operations"""
+    d_star = d_star_engine.DStarLight(d_star_engine.State(0,0), d_star_engine.State(WIDTH-1,DEPTH-1), costs.copy())
+    d_star.compute_shortest_path(False)
+    path = d_star.get_path()
+    print("First computation with src.d_star")
+    print(f"Expansions: {d_star.expansions}, heap operations: {d_star.u.operations()}")
+
+    expansions = d_star.expansions
+    operations = d_star.u.operations()
+    d_star.s_start = d_star_engine.State(int(path[15][0]), int(path[15][1]))
+    d_star.add_obstacles([d_star_engine.State(40, y) for y in range(20, 26)])
+    d_star.get_path()
+    print("After obstacle with src.d_star")
+    print(f"Expansions: {d_star.expansions - expansions}, heap operations: {d_star.u.operations() - operations}")
+
     
 
 
@@ -0,0 +1,71 @@
+import asyncio
+import numpy as np
+
+from src.constants import Side
+from src.d_star import State
+from src.path_cache import PathCache
+from src.planner_worker import PlannerWorker
+from src.playing_area import PlayingArea
+
+def walled_area() -> PlayingArea:
+    """Area whose moves below cross a wall, so that they go to the planner"""
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.cost = np.ones((60, 40))
+    area.cost[25, 5:35] = 10**10
+    return area
+
+def test_plan_does_not_block_the_loop():
+    worker = PlannerWorker(walled_area(), PathCache())
+
+    async def scenario() -> tuple[int, np.ndarray]:
+        ticks = 0
+        task = asyncio.create_task(worker.plan(State(5, 5), State(50, 30)))
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0)
+        return (ticks, task.result())
+
+    (ticks, path) = asyncio.run(scenario())
+    worker.stop()
+    assert ticks > 0
+    assert tuple(path[0]) == (5, 5) and tuple(path[-1]) == (50, 30)
+
+def test_new_request_supersedes_old_one():
+    worker = PlannerWorker(walled_area(), PathCache())
+
+    async def scenario() -> tuple[BaseException | None, np.ndarray]:
+        first = asyncio.create_task(worker.plan(State(5, 5), State(50, 30)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(worker.plan(State(5, 5), State(30, 10)))
+        await asyncio.wait([first, second])
+        return (None if not first.cancelled() else asyncio.CancelledError(), second.result())
+
+    (first_error, path) = asyncio.run(scenario())
+    worker.stop()
+    assert isinstance(first_error, asyncio.CancelledError)
+    assert tuple(path[-1]) == (30, 10)
+
+def test_waiting_request_starts_from_last_position():
+    worker = PlannerWorker(walled_area(), PathCache())
+
+    async def scenario() -> np.ndarray:
+        with worker.condition:
+            task = asyncio.create_task(worker.plan(State(5, 5), State(50, 30)))
+            await asyncio.sleep(0)
+            worker.set_start(500, 600)
+        return await task
+
+    path = asyncio.run(scenario())
+    worker.stop()
+    assert tuple(path[0]) == (10, 12)
+
+def test_clear_segment_is_not_planned():
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.cost = np.ones((60, 40))
+    cache = PathCache()
+    worker = PlannerWorker(area, cache)
+    path = asyncio.run(worker.plan(State(4, 6), State(14, 6)))
+    assert path.tolist() == [[4, 6], [14, 6]]
+    assert cache.misses == 0 and worker.thread is None
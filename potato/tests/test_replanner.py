@@ -0,0 +1,35 @@
+from src.constants import Side
+from src.d_star import ArrayDStarLight, State
+from src.playing_area import PlayingArea, BIG_NUMBER
+from src.replanner import Replanner
+
+def blue_area() -> PlayingArea:
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    return area
+
+def test_replan_when_opponent_moves():
+    area = blue_area()
+    goal = State(50, 20)
+    replanner = Replanner(area, State(5, 5), goal)
+    path = replanner.d_star.path
+    for (x, y) in [(1300, 1000), (1500, 1100), (2500, 1700)]:
+        area.set_other_robot_position(x, y)
+        start = State(int(path[5][0]), int(path[5][1]))
+        expansions = replanner.d_star.expansions
+        path = replanner.replan(start)
+        repair_expansions = replanner.d_star.expansions - expansions
+
+        fresh = ArrayDStarLight(start, goal, area.cost.copy())
+        fresh.compute_shortest_path(False)
+        assert abs(replanner.d_star.g[start.value] - fresh.g[start.value]) < 0.01 * fresh.g[start.value]
+        assert all(area.cost[int(px), int(py)] < BIG_NUMBER for (px, py) in path)
+        assert repair_expansions < fresh.expansions
+
+def test_replan_after_move_only():
+    area = blue_area()
+    replanner = Replanner(area, State(30, 20), State(50, 20))
+    path = replanner.replan(State(2, 38))
+    assert path[0].tolist() == [2, 38]
+    assert (int(path[-1, 0]), int(path[-1, 1])) == (50, 20)
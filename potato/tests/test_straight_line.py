@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.constants import Side
+from src.playing_area import PlayingArea
+from src.straight_line import segment_is_clear, supercover
+from src.zone import Rectangle
+
+def test_supercover_contains_sampled_cells():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        (a, b) = rng.uniform(0, 40, (2, 2))
+        cells = {tuple(cell) for cell in supercover(tuple(a), tuple(b), 60, 40).tolist()}
+        t = np.linspace(0, 1, 2000)[:, None]
+        sampled = {tuple(cell) for cell in np.floor(a + t * (b - a)).astype(int).tolist()}
+        assert sampled <= cells
+        # No cell away from the segment
+        assert len(cells) <= 2 * (abs(int(b[0]) - int(a[0])) + abs(int(b[1]) - int(a[1])) + 1)
+
+def test_supercover_on_corners():
+    assert supercover((0.5, 0.5), (2.5, 2.5), 60, 40).tolist() == [[0, 0], [0, 1], [1, 0], [1, 1], [1, 2], [2, 1], [2, 2]]
+    assert supercover((0, 0), (0, 0), 60, 40).tolist() == [[0, 0]]
+
+def test_rectangle_intersect_with_line():
+    rectangle = Rectangle(100, 100, 200, 300)
+    assert rectangle.intersect_with_line((0, 0), (300, 400))
+    assert rectangle.intersect_with_line((150, 150), (160, 160))
+    assert rectangle.intersect_with_line((150, 0), (150, 1000))
+    assert rectangle.intersect_with_line((0, 300), (100, 300))
+    assert not rectangle.intersect_with_line((0, 0), (300, 50))
+    assert not rectangle.intersect_with_line((0, 0), (90, 900))
+    assert not rectangle.intersect_with_line((250, 0), (250, 1000))
+
+def test_segment_on_the_playing_area():
+    area = PlayingArea()
+    area.side = Side.BLUE
+    area.compute_costs()
+    assert area.is_segment_clear((600, 1000), (600, 1800))
+    # Out of the zones, but where the pots at (35, 612.5) add a clearance penalty
+    assert not any(zone.intersect_with_line((200, 300), (700, 300)) for zone in area.obstacle_zones())
+    assert not area.is_segment_clear((200, 300), (700, 300))
+    # Along the pots at (35, 612.5)
+    assert not area.is_segment_clear((300, 300), (300, 900))
+    # Through the plants at (1000, 700)
+    assert not area.is_segment_clear((300, 700), (1700, 700))
+    assert not segment_is_clear(area.cost, (6, 14), (34, 14))
+    # Into the reserved start area of the other side
+    assert not area.is_segment_clear((1500, 1000), (2800, 1800))
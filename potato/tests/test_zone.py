@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.zone import Circle, Rectangle
+
+def test_window_mask_matches_full_grid():
+    rng = np.random.default_rng(2)
+    for resolution in [25, 50, 100]:
+        width, depth = 3000 // resolution, 2000 // resolution
+        for _ in range(200):
+            circle = Circle(*rng.uniform(-500, 3500, 2), rng.uniform(10, 400))
+            x_center, y_center = int(circle.x_center / resolution), int(circle.y_center / resolution)
+            X, Y = np.ogrid[:width, :depth]
+            expected = np.ceil(np.sqrt((X - x_center)**2 + (Y - y_center)**2)) <= circle._radius / resolution
+            (window, mask) = circle.window_mask(resolution)
+            assert mask.shape == expected[window].shape
+            assert np.array_equal(circle.points_in_zone(resolution), expected)
+
+def test_masks_are_shared():
+    (_, first) = Circle(1000, 700, 125).zone_with_robot_size().window_mask()
+    (_, second) = Circle(1000, 700, 125).zone_with_robot_size().window_mask()
+    assert first is second and not first.flags.writeable
+    (window, mask) = Rectangle(0, 1550, 450, 2000).window_mask()
+    assert window == (slice(0, 10), slice(31, 40)) and mask.all()